@@ -0,0 +1,104 @@
+"""Recall and latency of the ANN index types against the flat baseline.
+
+Run from apps/backend:
+
+    python -m benchmarks.ann_recall --vectors 100000 --nprobe 4 16 64 --ef-search 32 64 128
+
+Builds every index kind from ``server.services.index_factory`` over the same
+synthetic clustered unit vectors, then reports build time, serialized size,
+recall@k against exact ``IndexFlatIP`` results and single-query p50/p95
+latency for each search parameter.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+DIMENSION = 384
+
+
+def make_vectors(count: int, dimension: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype('float32')
+    vectors = centers[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dimension)).astype('float32')
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _search_timings(index, queries: np.ndarray, k: int):
+    found = np.empty((len(queries), k), dtype='int64')
+    timings = []
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        timings.append((time.perf_counter() - started) * 1000)
+        found[i] = ids[0]
+    return found, timings
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def _row(kind, param, build_s, size, found, truth, timings):
+    return {
+        'index': kind,
+        'param': param,
+        'build_s': round(build_s, 3),
+        'bytes': size,
+        'recall': round(_recall(found, truth), 4),
+        'p50_ms': round(float(np.percentile(timings, 50)), 4),
+        'p95_ms': round(float(np.percentile(timings, 95)), 4),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vectors', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--clusters', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--kinds', nargs='+', default=['flat', 'ivf', 'hnsw', 'ivfpq'])
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[4, 16, 64])
+    parser.add_argument('--ef-search', type=int, nargs='+', default=[32, 64, 128])
+    args = parser.parse_args(argv)
+
+    import faiss
+    from server.services.index_factory import build_index
+
+    vectors = make_vectors(args.vectors + args.queries, DIMENSION, args.clusters)
+    vectors, queries = vectors[:args.vectors], vectors[args.vectors:]
+    ids = np.arange(args.vectors, dtype='int64')
+
+    exact = faiss.IndexFlatIP(DIMENSION)
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.k)
+
+    results = []
+    for kind in args.kinds:
+        started = time.perf_counter()
+        index = build_index(kind, vectors, ids)
+        build_s = time.perf_counter() - started
+        size = len(faiss.serialize_index(index))
+        if kind in ('ivf', 'ivfpq'):
+            for nprobe in args.nprobe:
+                index.nprobe = nprobe
+                found, timings = _search_timings(index, queries, args.k)
+                results.append(_row(kind, f'nprobe={nprobe}', build_s, size, found, truth, timings))
+        elif kind == 'hnsw':
+            hnsw = faiss.downcast_index(index.index).hnsw
+            for ef_search in args.ef_search:
+                hnsw.efSearch = ef_search
+                found, timings = _search_timings(index, queries, args.k)
+                results.append(_row(kind, f'efSearch={ef_search}', build_s, size, found, truth, timings))
+        else:
+            found, timings = _search_timings(index, queries, args.k)
+            results.append(_row(kind, '', build_s, size, found, truth, timings))
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Chat query latency against corpora of different sizes.
+
+Run from apps/backend:
+
+    python -m benchmarks.chat_latency --sizes 10 10000
+
+The chat path must only touch the persisted index, so the median latency for
+the largest corpus should stay within ``--max-ratio`` of the smallest one.
+``--stub-embeddings`` swaps SentenceTransformer for a hashing encoder so the
+benchmark runs offline and measures retrieval cost only.
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from server.testing import DIMENSION, configure
+
+
+def _seed_user(user_id: str, n_chunks: int, text_size: int) -> None:
+    from server.services.vectors import get_meta_store, new_vector_index, write_user_index
+
+    rng = np.random.default_rng(n_chunks)
+    vectors = rng.standard_normal((n_chunks, DIMENSION)).astype('float32')
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = new_vector_index(DIMENSION)
+    store = get_meta_store(user_id)
+    first_id = store.allocate_ids(n_chunks)
+    ids = np.arange(first_id, first_id + n_chunks, dtype='int64')
+    index.add_with_ids(vectors, ids)
+    write_user_index(user_id, index)
+
+    filler = ('lorem ipsum dolor sit amet ' * (text_size // 27 + 1))[:text_size]
+    chunks = [
+        {'text': filler, 'metadata': {'file_id': 'bench', 'filename': 'bench.txt', 'chunk_index': i}}
+        for i in range(n_chunks)
+    ]
+    document = {'file_id': 'bench', 'filename': 'bench.txt', 'file_path': '', 'chunk_count': n_chunks}
+    store.add_chunks(chunks, ids)
+    store.add_document(document)
+
+
+def _time_queries(client, user_id: str, requests: int, warmup: int):
+    timings = []
+    for i in range(warmup + requests):
+        started = time.perf_counter()
+        resp = client.post('/api/chat', json={'query': f'question {i % 7}'}, headers={'X-User-Id': user_id})
+        elapsed = time.perf_counter() - started
+        if resp.status_code != 200:
+            raise RuntimeError(f'chat returned {resp.status_code}: {resp.get_data(as_text=True)}')
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+    return timings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 10000])
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--text-size', type=int, default=1000)
+    parser.add_argument('--max-ratio', type=float, default=None)
+    parser.add_argument('--stub-embeddings', action='store_true')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = configure(workdir, args.stub_embeddings)
+        client = app.test_client()
+        results = {}
+        for size in args.sizes:
+            user_id = f'bench-{size}'
+            _seed_user(user_id, size, args.text_size)
+            timings = _time_queries(client, user_id, args.requests, args.warmup)
+            results[size] = {
+                'p50_ms': round(statistics.median(timings), 3),
+                'max_ms': round(max(timings), 3),
+            }
+
+    smallest, largest = min(args.sizes), max(args.sizes)
+    ratio = results[largest]['p50_ms'] / max(results[smallest]['p50_ms'], 1e-9)
+    print(json.dumps({'chunks': results, 'p50_ratio': round(ratio, 2)}, indent=2))
+    if args.max_ratio is not None and ratio > args.max_ratio:
+        print(f'p50 latency grew {ratio:.2f}x from {smallest} to {largest} chunks (limit {args.max_ratio}x)', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
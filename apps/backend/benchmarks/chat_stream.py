@@ -0,0 +1,96 @@
+"""Time-to-first-byte of ``/api/chat`` versus ``/api/chat/stream``.
+
+Run from apps/backend:
+
+    python -m benchmarks.chat_stream --stub-embeddings --first-token-ms 800 --token-ms 30
+
+Starts ``benchmarks.stub_llm`` and the Flask app on localhost ports and
+issues real HTTP requests, reporting median time to the first response byte,
+to the first answer token and to the end of the response for both endpoints.
+The answer cache is cleared before each pass so every request reaches the
+stub LLM.
+"""
+import argparse
+import http.client
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from server.testing import configure
+from .chat_latency import _seed_user
+from .stub_llm import start_stub_llm
+
+
+def _request(port: int, path: str, user_id: str, query: str):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    body = json.dumps({'query': query})
+    started = time.perf_counter()
+    conn.request('POST', path, body=body, headers={'Content-Type': 'application/json', 'X-User-Id': user_id})
+    resp = conn.getresponse()
+    if resp.status != 200:
+        raise RuntimeError(f'{path} returned {resp.status}: {resp.read()[:200]!r}')
+    first_byte = first_token = None
+    buffer = b''
+    while True:
+        data = resp.read1(65536)
+        if not data:
+            break
+        now = time.perf_counter()
+        if first_byte is None:
+            first_byte = now
+        buffer += data
+        if first_token is None and (b'event: token' in buffer or b'"answer"' in buffer):
+            first_token = now
+    finished = time.perf_counter()
+    conn.close()
+    return {
+        'ttfb_ms': (first_byte - started) * 1000,
+        'first_token_ms': ((first_token or finished) - started) * 1000,
+        'total_ms': (finished - started) * 1000,
+    }
+
+
+def _summarise(samples):
+    return {key: round(statistics.median(sample[key] for sample in samples), 2) for key in samples[0]}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--chunks', type=int, default=1000)
+    parser.add_argument('--first-token-ms', type=float, default=800)
+    parser.add_argument('--token-ms', type=float, default=30)
+    parser.add_argument('--stub-embeddings', action='store_true')
+    args = parser.parse_args(argv)
+
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    llm, base_url = start_stub_llm(first_token_ms=args.first_token_ms, token_ms=args.token_ms)
+    with tempfile.TemporaryDirectory() as workdir:
+        app = configure(workdir, args.stub_embeddings, llm_base_url=base_url)
+        from server.services.answer_cache import answer_cache
+        _seed_user('bench-stream', args.chunks, 1000)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+        try:
+            _request(port, '/api/chat/stream', 'bench-stream', 'warmup')
+            results = {}
+            for path in ('/api/chat', '/api/chat/stream'):
+                answer_cache.clear()
+                samples = [_request(port, path, 'bench-stream', f'question {i}') for i in range(args.requests)]
+                results[path] = _summarise(samples)
+        finally:
+            server.shutdown()
+            llm.shutdown()
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
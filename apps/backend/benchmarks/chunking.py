@@ -0,0 +1,83 @@
+"""Chunker micro-benchmark: legacy ``chunk_text`` versus ``iter_text_chunks``.
+
+Run from apps/backend:
+
+    python -m benchmarks.chunking --megabytes 1 4 16
+
+Reports wall time and MB/s for each chunker on synthetic prose. Token sizing
+needs the embedding model's tokenizer and is only measured with ``--tokens``.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+WORDS = (
+    'the of and to in is was for on that with as by at from his her an were are which this be or '
+    'has had not but what all when there can more if no out so said who about up into than them '
+    'manual pressure valve assembly torque specification warranty section figure table'
+).split()
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size:
+        sentence = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 28))).capitalize() + '.'
+        if rng.random() < 0.15:
+            sentence += '\n'
+        parts.append(sentence)
+        total += len(sentence) + 1
+    return ' '.join(parts)[:size]
+
+
+def _pages(text: str, page_size: int = 3000):
+    for page, start in enumerate(range(0, len(text), page_size), start=1):
+        yield page, text[start:start + page_size]
+
+
+def _time(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megabytes', type=float, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--overlap', type=int, default=200)
+    parser.add_argument('--tokens', action='store_true')
+    args = parser.parse_args(argv)
+
+    from server.utils.files import chunk_text
+    from server.utils.chunking import iter_text_chunks
+
+    token_setup = None
+    if args.tokens:
+        from server.services.embeddings import token_lengths, max_chunk_tokens
+        token_setup = (max_chunk_tokens(), token_lengths)
+
+    results = []
+    for megabytes in args.megabytes:
+        text = make_text(int(megabytes * 1024 * 1024))
+        legacy_s, legacy = _time(lambda: chunk_text(text, args.chunk_size, args.overlap))
+        stream_s, streamed = _time(lambda: list(iter_text_chunks(_pages(text), args.chunk_size, args.overlap)))
+        row = {
+            'megabytes': megabytes,
+            'chunk_text': {'seconds': round(legacy_s, 4), 'mb_per_s': round(megabytes / legacy_s, 2), 'chunks': len(legacy)},
+            'iter_text_chunks': {'seconds': round(stream_s, 4), 'mb_per_s': round(megabytes / stream_s, 2), 'chunks': len(streamed)},
+        }
+        if token_setup:
+            max_tokens, length_fn = token_setup
+            token_s, tokened = _time(lambda: list(iter_text_chunks(_pages(text), max_tokens, max_tokens // 5, length_fn)))
+            row['iter_text_chunks_tokens'] = {'seconds': round(token_s, 4), 'mb_per_s': round(megabytes / token_s, 2), 'chunks': len(tokened)}
+        results.append(row)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Synthetic txt, PDF and DOCX documents for benchmarks.
+
+Run from apps/backend to write a corpus to disk:
+
+    python -m benchmarks.corpus --out /tmp/corpus --documents 30 --kilobytes 64
+
+Documents are seeded prose from ``benchmarks.chunking.make_text``, so the same
+arguments always produce byte-identical files. PDFs are written directly
+(Helvetica text pages, no extra dependency) and DOCX files with
+python-docx, so every format goes through the real extractors.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import textwrap
+from typing import List, Tuple
+
+import docx
+
+from .chunking import make_text
+
+FORMATS = ('txt', 'pdf', 'docx')
+PDF_LINE_CHARS = 90
+PDF_LINES_PER_PAGE = 50
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(text: str) -> bytes:
+    lines = []
+    for paragraph in text.split('\n'):
+        lines.extend(textwrap.wrap(paragraph, PDF_LINE_CHARS) or [''])
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for page_lines in pages:
+        stream = 'BT /F1 10 Tf 14 TL 40 800 Td ' + ' '.join(f'({_pdf_escape(line)}) Tj T*' for line in page_lines) + ' ET'
+        content = stream.encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(content), content))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (len(objects),)
+        )
+        page_ids.append(len(objects))
+    kids = b' '.join(b'%d 0 R' % page_id for page_id in page_ids)
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(text: str) -> bytes:
+    document = docx.Document()
+    for paragraph in text.split('\n'):
+        document.add_paragraph(paragraph)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def make_document(fmt: str, size: int, seed: int) -> bytes:
+    text = make_text(size, seed=seed)
+    if fmt == 'txt':
+        return text.encode('utf-8')
+    if fmt == 'pdf':
+        return make_pdf(text)
+    if fmt == 'docx':
+        return make_docx(text)
+    raise ValueError(f'Unsupported format: {fmt}')
+
+
+def make_corpus(documents: int, size: int, formats=FORMATS, seed: int = 0) -> List[Tuple[str, bytes]]:
+    """Return ``documents`` (filename, bytes) pairs cycling through ``formats``, each ~``size`` characters of text."""
+    corpus = []
+    for i in range(documents):
+        fmt = formats[i % len(formats)]
+        corpus.append((f'doc-{seed}-{i:05d}.{fmt}', make_document(fmt, size, seed * 1000003 + i)))
+    return corpus
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--documents', type=int, default=30)
+    parser.add_argument('--kilobytes', type=int, default=64)
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    total = 0
+    for filename, data in make_corpus(args.documents, args.kilobytes * 1024, tuple(args.formats), args.seed):
+        with open(os.path.join(args.out, filename), 'wb') as f:
+            f.write(data)
+        total += len(data)
+    print(json.dumps({'out': args.out, 'documents': args.documents, 'bytes': total}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
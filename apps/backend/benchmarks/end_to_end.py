@@ -0,0 +1,320 @@
+"""End-to-end benchmark: upload throughput, chat latency percentiles and RSS.
+
+Run from apps/backend:
+
+    python -m benchmarks.end_to_end --stub-embeddings --documents 30 --kilobytes 64 \\
+        --chat-requests 200 --output results.json
+
+Generates a seeded txt/PDF/DOCX corpus (``benchmarks.corpus``), uploads it
+through ``/api/upload`` and waits for the ingest jobs, then sends
+``--chat-requests`` questions to ``/api/chat`` from ``--concurrency``
+threads. ``--server test-client`` drives ``create_app()`` in-process;
+``--server wsgi`` serves it on a localhost port and uses real HTTP.
+``--llm patch`` replaces ``openai.chat.completions.create`` with an
+immediate stub; ``--llm http`` points the app at ``benchmarks.stub_llm``
+with ``--first-token-ms``/``--token-ms`` latency. A ``--repeat-fraction`` of
+the questions repeat earlier ones, so answer-cache hits are exercised too.
+
+The JSON report holds the configuration, upload and chat results,
+per-stage sums from ``/api/metrics``, and RSS after each phase. Runs with
+the same arguments can be diffed between releases.
+"""
+import argparse
+import http.client
+import io
+import json
+import logging
+import math
+import os
+import platform
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from server.testing import configure
+from .corpus import FORMATS, make_corpus
+from .stub_llm import start_stub_llm
+
+QUESTION_TOPICS = ('valve assembly', 'torque specification', 'warranty section', 'pressure table', 'figure')
+
+
+class TestClientDriver:
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client
+
+    def upload(self, user_id, files):
+        data = {'files': [(io.BytesIO(content), filename) for filename, content in files]}
+        resp = self.client.post('/api/upload', data=data, headers={'X-User-Id': user_id}, content_type='multipart/form-data')
+        return resp.status_code, resp.get_json()
+
+    def get(self, path, user_id=None):
+        resp = self.client.get(path, headers={'X-User-Id': user_id} if user_id else {})
+        return resp.status_code, resp.get_data(as_text=True)
+
+    def chat(self, user_id, query):
+        resp = self.client.post('/api/chat', json={'query': query}, headers={'X-User-Id': user_id})
+        return resp.status_code, resp.get_json()
+
+
+class HTTPDriver:
+    def __init__(self, port):
+        self.port = port
+        self._local = threading.local()
+
+    def _request(self, method, path, body=None, headers=None):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=120)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            return resp.status, resp.read()
+        except (ConnectionError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+
+    def upload(self, user_id, files):
+        boundary = uuid.uuid4().hex
+        body = io.BytesIO()
+        for filename, content in files:
+            body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+                       f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8'))
+            body.write(content)
+            body.write(b'\r\n')
+        body.write(f'--{boundary}--\r\n'.encode('utf-8'))
+        status, data = self._request('POST', '/api/upload', body.getvalue(), {
+            'Content-Type': f'multipart/form-data; boundary={boundary}',
+            'X-User-Id': user_id,
+        })
+        return status, json.loads(data)
+
+    def get(self, path, user_id=None):
+        status, data = self._request('GET', path, headers={'X-User-Id': user_id} if user_id else {})
+        return status, data.decode('utf-8')
+
+    def chat(self, user_id, query):
+        status, data = self._request('POST', '/api/chat', json.dumps({'query': query}).encode('utf-8'), {
+            'Content-Type': 'application/json',
+            'X-User-Id': user_id,
+        })
+        return status, json.loads(data)
+
+
+def _rss_mb():
+    fields = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in ('VmRSS', 'VmHWM'):
+                    fields[name] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    peak = fields.get('VmHWM')
+    if peak is None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+    return {'current': round(fields.get('VmRSS', peak), 1), 'peak': round(peak, 1)}
+
+
+def _percentile(sorted_values, percent):
+    return sorted_values[max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)]
+
+
+def _latency_summary(timings):
+    timings = sorted(timings)
+    return {
+        'count': len(timings),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(_percentile(timings, 50), 3),
+        'p95_ms': round(_percentile(timings, 95), 3),
+        'p99_ms': round(_percentile(timings, 99), 3),
+        'max_ms': round(timings[-1], 3),
+    }
+
+
+def _wait_for_job(driver, user_id, job_id):
+    while True:
+        status, text = driver.get(f'/api/jobs/{job_id}', user_id)
+        job = json.loads(text)
+        if status != 200 or job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.01)
+
+
+def _run_uploads(driver, corpus, users, batch_size):
+    batches = []
+    for i, user_id in enumerate(users):
+        files = corpus[i::len(users)]
+        batches.extend((user_id, files[start:start + batch_size]) for start in range(0, len(files), batch_size))
+
+    started = time.perf_counter()
+    jobs = []
+    for user_id, files in batches:
+        status, body = driver.upload(user_id, files)
+        if status != 202:
+            raise RuntimeError(f'upload returned {status}: {body}')
+        jobs.append((user_id, body['job_id']))
+    finished = [_wait_for_job(driver, user_id, job_id) for user_id, job_id in jobs]
+    elapsed = time.perf_counter() - started
+
+    files = [f for job in finished for f in job['files']]
+    chunks = sum(f['chunk_count'] or 0 for f in files)
+    total_bytes = sum(len(content) for _, content in corpus)
+    return {
+        'documents': len(corpus),
+        'bytes': total_bytes,
+        'failed': sum(1 for f in files if f['status'] == 'failed'),
+        'chunks': chunks,
+        'seconds': round(elapsed, 3),
+        'documents_per_second': round(len(corpus) / elapsed, 2),
+        'mb_per_second': round(total_bytes / elapsed / (1024 * 1024), 3),
+        'chunks_per_second': round(chunks / elapsed, 1),
+    }
+
+
+def _questions(count, repeat_fraction, seed):
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        if questions and rng.random() < repeat_fraction:
+            questions.append(rng.choice(questions))
+        else:
+            questions.append(f'What does the manual say about the {rng.choice(QUESTION_TOPICS)} in case {i}?')
+    return questions
+
+
+def _run_chats(driver, users, questions, warmup, concurrency):
+    for i in range(warmup):
+        driver.chat(users[i % len(users)], f'warmup question {i}')
+
+    def ask(i):
+        started = time.perf_counter()
+        status, body = driver.chat(users[i % len(users)], questions[i])
+        elapsed = (time.perf_counter() - started) * 1000
+        if status != 200:
+            raise RuntimeError(f'chat returned {status}: {body}')
+        return elapsed, bool(body.get('cached'))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(ask, range(len(questions))))
+    elapsed = time.perf_counter() - started
+    summary = _latency_summary([timing for timing, _ in results])
+    summary['requests_per_second'] = round(len(results) / elapsed, 2)
+    summary['cached'] = sum(1 for _, cached in results if cached)
+    return summary
+
+
+def _stage_totals(driver):
+    _, text = driver.get('/api/metrics')
+    stages = {}
+    for name, stage, value in re.findall(r'^docbot_stage_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$', text, re.M):
+        stages.setdefault(stage, {})['seconds' if name == 'sum' else 'count'] = (
+            round(float(value), 4) if name == 'sum' else int(float(value))
+        )
+    return stages
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=30)
+    parser.add_argument('--kilobytes', type=int, default=64)
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--users', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--chat-requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--repeat-fraction', type=float, default=0.0)
+    parser.add_argument('--server', choices=('test-client', 'wsgi'), default='test-client')
+    parser.add_argument('--llm', choices=('patch', 'http'), default='patch')
+    parser.add_argument('--first-token-ms', type=float, default=300)
+    parser.add_argument('--token-ms', type=float, default=10)
+    parser.add_argument('--stub-embeddings', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    rss = {'start': _rss_mb()}
+    corpus = make_corpus(args.documents, args.kilobytes * 1024, tuple(args.formats), args.seed)
+    users = [f'bench-user-{i}' for i in range(args.users)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        llm_server = None
+        llm_base_url = None
+        if args.llm == 'http':
+            llm_server, llm_base_url = start_stub_llm(0, args.first_token_ms, args.token_ms)
+        app = configure(workdir, args.stub_embeddings, llm_base_url)
+        rss['app_ready'] = _rss_mb()
+
+        wsgi_server = None
+        if args.server == 'wsgi':
+            from werkzeug.serving import make_server
+            logging.getLogger('werkzeug').setLevel(logging.WARNING)
+            wsgi_server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=wsgi_server.serve_forever, daemon=True).start()
+            driver = HTTPDriver(wsgi_server.server_port)
+        else:
+            driver = TestClientDriver(app)
+
+        try:
+            upload = _run_uploads(driver, corpus, users, args.batch_size)
+            rss['after_upload'] = _rss_mb()
+            questions = _questions(args.chat_requests, args.repeat_fraction, args.seed)
+            chat = _run_chats(driver, users, questions, args.warmup, args.concurrency)
+            rss['after_chat'] = _rss_mb()
+            stages = _stage_totals(driver)
+        finally:
+            if wsgi_server is not None:
+                wsgi_server.shutdown()
+            if llm_server is not None:
+                llm_server.shutdown()
+
+    report = {
+        'config': vars(args),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'git_commit': _git_commit(),
+        },
+        'upload': upload,
+        'chat': chat,
+        'stages': stages,
+        'rss_mb': rss,
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Cost of hybrid (BM25 + vector) retrieval over dense-only retrieval.
+
+Run from apps/backend:
+
+    python -m benchmarks.hybrid_search --stub-embeddings --sizes 1000 50000
+
+Seeds one user per corpus size through ``add_user_document`` and times
+``MetaStore.keyword_search`` alone and ``search_similar_chunks`` with
+``HYBRID_SEARCH`` off and on, reporting p50/p95 in milliseconds. Every 97th
+chunk carries a part number, and ``identifier_hit_rate`` reports how often
+the chunk holding a queried part number is in the top 5.
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+from server.testing import configure
+from .chunking import make_text
+
+
+def _percentiles(timings):
+    timings = sorted(timings)
+    return {
+        'p50_ms': round(statistics.median(timings), 4),
+        'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 4),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 50000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--stub-embeddings', action='store_true')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure(workdir, args.stub_embeddings)
+        from server.config import Config
+        from server.services.vectors import add_user_document, encode_texts, get_meta_store, load_user_index, search_similar_chunks
+
+        results = {}
+        for size in args.sizes:
+            user_id = f'hybrid-{size}'
+            texts = [make_text(300, seed=i) for i in range(size)]
+            for i in range(0, size, 97):
+                texts[i] += f' Replace gasket part number GK-{i:06d} every year.'
+            chunks = [{'text': text, 'metadata': {'file_id': 'bench', 'chunk_index': i}} for i, text in enumerate(texts)]
+            add_user_document(user_id, {'file_id': 'bench', 'filename': 'bench.txt', 'file_path': '', 'chunk_count': size}, chunks)
+            index, store = load_user_index(user_id), get_meta_store(user_id)
+            targets = list(range(0, size, 97))
+            queries = [f'which gasket is GK-{targets[i % len(targets)]:06d}' for i in range(args.queries)]
+            embeddings = [encode_texts([query]) for query in queries]
+
+            row = {}
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                store.keyword_search(query, Config.HYBRID_CANDIDATES)
+                timings.append((time.perf_counter() - started) * 1000)
+            row['keyword'] = _percentiles(timings)
+            for mode, hybrid in (('dense', 0), ('hybrid', 1)):
+                Config.HYBRID_SEARCH = hybrid
+                timings, found = [], 0
+                for i, (query, embedding) in enumerate(zip(queries, embeddings)):
+                    started = time.perf_counter()
+                    hits = search_similar_chunks(query, index, store, k=5, query_embedding=embedding)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    found += targets[i % len(targets)] in [hit['metadata']['chunk_index'] for hit in hits]
+                row[mode] = dict(_percentiles(timings), identifier_hit_rate=round(found / len(queries), 3))
+            results[size] = row
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
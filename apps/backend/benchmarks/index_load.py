@@ -0,0 +1,77 @@
+"""First-query latency and resident memory for heap-loaded versus mmapped indexes.
+
+Run from apps/backend:
+
+    python -m benchmarks.index_load --users 20 --vectors 50000
+
+Writes one flat index per user, then for each loading mode opens every user's
+index through a fresh ``IndexCache`` and runs one query, reporting the median
+cold first-query latency and how much private (heap) and file-backed (page
+cache, shareable between worker processes) resident memory grew.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DIMENSION = 384
+
+
+def _rss_mb():
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('RssAnon:', 'RssFile:')):
+                name, kb = line.split()[:2]
+                values[name[:-1]] = int(kb) / 1024
+    return values['RssAnon'], values['RssFile']
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--vectors', type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    from server.services.index_cache import IndexCache
+    from server.services.index_factory import build_index, write_index_file
+
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal((1, DIMENSION)).astype('float32')
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for user in range(args.users):
+            vectors = rng.standard_normal((args.vectors, DIMENSION)).astype('float32')
+            path = os.path.join(workdir, f'user{user}_index.faiss')
+            write_index_file(build_index('flat', vectors, np.arange(args.vectors, dtype='int64')), path)
+            paths.append(path)
+        del vectors
+
+        for mode, mmap in (('heap', False), ('mmap', True)):
+            cache = IndexCache(2 ** 62, mmap=mmap)
+            before = _rss_mb()
+            timings = []
+            for user, path in enumerate(paths):
+                started = time.perf_counter()
+                cache.get(str(user), path).search(query, 5)
+                timings.append((time.perf_counter() - started) * 1000)
+            anon, shared = _rss_mb()
+            results[mode] = {
+                'first_query_p50_ms': round(statistics.median(timings), 3),
+                'private_rss_growth_mb': round(anon - before[0], 1),
+                'shared_rss_growth_mb': round(shared - before[1], 1),
+                'index_file_mb': round(sum(os.path.getsize(path) for path in paths) / 2 ** 20, 1),
+            }
+            cache.clear()
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
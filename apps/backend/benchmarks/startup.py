@@ -0,0 +1,68 @@
+"""Worker start-up cost: time until /api/health answers in a fresh process.
+
+Run from apps/backend:
+
+    python -m benchmarks.startup --runs 5 --stub-embeddings
+
+Each run starts a new interpreter that builds the app, requests
+``/api/health`` and then ``/api/stats``. It reports the wall time to the
+first health response, the server's own startup timings, and whether the
+embedding model had been loaded by then. With ``--preload`` the model is
+loaded in ``create_app`` (``PRELOAD_EMBEDDING_MODEL=1``), as a gunicorn
+``--preload`` master would do before forking workers.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from server.testing import configure
+app = configure(sys.argv[1], sys.argv[2] == '1')
+client = app.test_client()
+client.get('/api/health')
+ready = time.perf_counter() - started
+print(json.dumps({
+    'ready_seconds': ready,
+    'model_loaded': 'embedding_model_load' in client.get('/api/stats').get_json()['startup'],
+    'startup': client.get('/api/stats').get_json()['startup'],
+}))
+"""
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--preload', action='store_true')
+    parser.add_argument('--stub-embeddings', action='store_true')
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, PRELOAD_EMBEDDING_MODEL='1' if args.preload else '0')
+    runs = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            output = subprocess.run(
+                [sys.executable, '-c', CHILD, workdir, '1' if args.stub_embeddings else '0'],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    stages = sorted({stage for run in runs for stage in run['startup']})
+    print(json.dumps({
+        'preload': args.preload,
+        'ready_p50_seconds': round(statistics.median(run['ready_seconds'] for run in runs), 4),
+        'model_loaded': runs[-1]['model_loaded'],
+        'stages_p50_seconds': {
+            stage: round(statistics.median(run['startup'].get(stage, 0.0) for run in runs), 4) for stage in stages
+        },
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Run from apps/backend:
+
+    python -m benchmarks.stub_llm --port 8081 --first-token-ms 800 --token-ms 30
+
+then start the server with ``OPENAI_BASE_URL=http://127.0.0.1:8081/v1/``.
+``POST /v1/chat/completions`` answers with a fixed reply after
+``--first-token-ms``, streamed as SSE chunks ``--token-ms`` apart when the
+request sets ``stream``, so time-to-first-byte can be measured offline.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = (
+    'Based on the uploaded documents, the valve assembly should be tightened to the torque in the '
+    'specification table and inspected at every service interval.'
+)
+
+
+def _tokens(text: str):
+    words = text.split(' ')
+    return [word if i == 0 else ' ' + word for i, word in enumerate(words)]
+
+
+def make_handler(first_token_ms: float, token_ms: float, reply: str = REPLY):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self.send_error(404)
+                return
+            time.sleep(first_token_ms / 1000)
+            if body.get('stream'):
+                self._stream(body)
+            else:
+                self._complete(body)
+
+        def _payload(self, body, **choice):
+            return {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion.chunk' if 'delta' in choice else 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', 'stub'),
+                'choices': [dict(index=0, **choice)],
+            }
+
+        def _complete(self, body):
+            time.sleep(token_ms * len(_tokens(reply)) / 1000)
+            data = self._payload(
+                body,
+                message={'role': 'assistant', 'content': reply},
+                finish_reason='stop',
+            )
+            data['usage'] = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+            encoded = json.dumps(data).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def _stream(self, body):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            for i, token in enumerate(_tokens(reply)):
+                if i:
+                    time.sleep(token_ms / 1000)
+                chunk = self._payload(body, delta={'content': token}, finish_reason=None)
+                self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+            done = self._payload(body, delta={}, finish_reason='stop')
+            self.wfile.write(f'data: {json.dumps(done)}\n\ndata: [DONE]\n\n'.encode('utf-8'))
+            self.wfile.flush()
+            self.close_connection = True
+
+    return StubHandler
+
+
+def start_stub_llm(port: int = 0, first_token_ms: float = 500, token_ms: float = 20):
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(first_token_ms, token_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/v1/'
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--first-token-ms', type=float, default=800)
+    parser.add_argument('--token-ms', type=float, default=30)
+    args = parser.parse_args(argv)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.first_token_ms, args.token_ms))
+    print(f'stub LLM listening on http://127.0.0.1:{args.port}/v1/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,9 @@
+# Keep first: it stamps the start of the imports recorded below.
+from .utils.startup import IMPORTS_STARTED, record, startup_timings, timed
+
 import os
+import time
+import logging
 from flask import Flask
 from flask_cors import CORS
 import openai
@@ -8,13 +13,33 @@ from .blueprints.auth import auth_bp
 from .blueprints.documents import documents_bp
 from .blueprints.chat import chat_bp
 from .blueprints.health import health_bp
+from .blueprints.jobs import jobs_bp
+from .blueprints.collections import collections_bp
+from .blueprints.metrics import metrics_bp
+from .blueprints.uploads import uploads_bp
+from .services.jobs import resume_pending_jobs_once
+from .services.embeddings import get_embedding_model
+
+record('imports', time.perf_counter() - IMPORTS_STARTED)
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> Flask:
+    with timed('create_app'):
+        app = _create_app()
+    if Config.PRELOAD_EMBEDDING_MODEL:
+        get_embedding_model()
+    logger.info('Startup timings (seconds): %s', startup_timings())
+    return app
+
+
+def _create_app() -> Flask:
     app = Flask(__name__)
     app.config.from_object(Config)
 
     openai.api_key = app.config['OPENAI_API_KEY']
+    if app.config['OPENAI_BASE_URL']:
+        openai.base_url = app.config['OPENAI_BASE_URL']
 
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     os.makedirs(app.config['VECTOR_DB_FOLDER'], exist_ok=True)
@@ -30,6 +55,12 @@ def create_app() -> Flask:
     app.register_blueprint(documents_bp, url_prefix='/api')
     app.register_blueprint(chat_bp, url_prefix='/api')
     app.register_blueprint(health_bp, url_prefix='/api')
+    app.register_blueprint(jobs_bp, url_prefix='/api')
+    app.register_blueprint(collections_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp, url_prefix='/api')
+    app.register_blueprint(uploads_bp, url_prefix='/api')
+
+    app.before_request(resume_pending_jobs_once)
 
     return app
 
@@ -1,32 +1,12 @@
 from flask import Blueprint, request, jsonify, make_response
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
 import uuid
-import os
-import json
-from ..config import Config
+from ..services.users import create_user, get_user_by_username, get_user_by_id
 
 
 auth_bp = Blueprint('auth', __name__)
 
 
-def _read_users():
-    path = Config.USERS_FILE
-    if os.path.exists(path):
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
-
-
-def _write_users(users):
-    path = Config.USERS_FILE
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(users, f, ensure_ascii=False, indent=2)
-
-
 @auth_bp.get('/ensure')
 def ensure_auth():
     user_id = request.cookies.get('user_id')
@@ -45,18 +25,9 @@ def signup():
     if not username or not password:
         return jsonify({'error': 'Username and password are required'}), 400
 
-    users = _read_users()
-    if username in users:
-        return jsonify({'error': 'Username already exists'}), 409
-
     user_id = str(uuid.uuid4())
-    users[username] = {
-        'user_id': user_id,
-        'username': username,
-        'password_hash': generate_password_hash(password),
-        'created_at': datetime.now().isoformat(),
-    }
-    _write_users(users)
+    if create_user(username, generate_password_hash(password), user_id) is None:
+        return jsonify({'error': 'Username already exists'}), 409
 
     resp = make_response(jsonify({'user_id': user_id, 'username': username}), 201)
     resp.set_cookie('user_id', user_id, httponly=True, samesite='Lax', secure=False, max_age=60*60*24*365, path='/')
@@ -71,8 +42,7 @@ def login():
     if not username or not password:
         return jsonify({'error': 'Username and password are required'}), 400
 
-    users = _read_users()
-    user = users.get(username)
+    user = get_user_by_username(username)
     if not user or not check_password_hash(user.get('password_hash', ''), password):
         return jsonify({'error': 'Invalid credentials'}), 401
 
@@ -94,14 +64,9 @@ def me():
     user_id = request.cookies.get('user_id')
     if not user_id:
         return jsonify({'authenticated': False}), 200
-    users = _read_users()
-    username = None
-    for uname, data in users.items():
-        if data.get('user_id') == user_id:
-            username = uname
-            break
-    if username is None:
+    user = get_user_by_id(user_id)
+    if user is None:
         return jsonify({'authenticated': False}), 200
-    return jsonify({'authenticated': True, 'user_id': user_id, 'username': username}), 200
+    return jsonify({'authenticated': True, 'user_id': user_id, 'username': user['username']}), 200
 
 
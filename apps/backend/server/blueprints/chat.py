@@ -1,11 +1,14 @@
-import os
 import json
+import time
 from datetime import datetime
-from flask import Blueprint, request, jsonify
+from typing import List, Dict, Any
+from flask import Blueprint, Response, request, jsonify
 import openai
-import faiss
-from ..services.vectors import get_user_vector_paths, search_similar_chunks, embedding_model
-from ..services.history import read_user_history, append_user_history
+from ..services.vectors import owner_vector_counts, search_owners, encode_texts
+from ..services.collections import COLLECTION_OWNER_PREFIX, subscribed_owner_ids
+from ..services.answer_cache import answer_cache
+from ..services.history import read_user_history_page, append_user_history
+from ..services.metrics import STAGE_SECONDS, stage_timer
 
 
 chat_bp = Blueprint('chat', __name__)
@@ -15,70 +18,69 @@ def _get_user_id() -> str:
     return request.cookies.get('user_id') or request.headers.get('X-User-Id')
 
 
-@chat_bp.post('/chat')
-def chat():
-    data = request.get_json() or {}
-    query = data.get('query', '')
-    user_id = _get_user_id()
-    if not query:
-        return jsonify({'error': 'No query provided'}), 400
-    if not user_id:
-        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
-
-    index_path, meta_path = get_user_vector_paths(user_id)
-    if not (os.path.exists(index_path) and os.path.exists(meta_path)):
-        return jsonify({'error': 'Invalid user_id or no documents uploaded'}), 400
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that answers questions based only on the provided context. "
+    "If the answer cannot be found in the context, say \"I cannot find information about that in the uploaded documents.\" "
+    "Be concise and accurate in your responses."
+)
 
-    index = faiss.read_index(index_path)
-    with open(meta_path, 'r', encoding='utf-8') as f:
-        meta_json = json.load(f)
-        metadata = meta_json.get('metadata', [])
-    if not metadata:
-        return jsonify({'error': 'No documents processed for this user'}), 400
 
-    texts = [meta['text'] for meta in metadata]
-    embeddings = embedding_model.encode(texts)
-    faiss.normalize_L2(embeddings)
-
-    relevant_chunks = search_similar_chunks(query, index, embeddings, metadata, k=5)
+def _retrieve(user_id: str, query: str):
+    owner_ids = [user_id] + subscribed_owner_ids(user_id)
+    counts = owner_vector_counts(owner_ids)
+    if all(count is None for count in counts):
+        return None, None, (jsonify({'error': 'Invalid user_id or no documents uploaded'}), 400)
+    if not any(counts):
+        return None, None, (jsonify({'error': 'No documents processed for this user'}), 400)
+    query_embedding = encode_texts([query])
+    relevant_chunks = search_owners(query, owner_ids, k=5, query_embedding=query_embedding)
     if not relevant_chunks:
-        return jsonify({'error': 'No relevant content found'}), 404
+        return None, None, (jsonify({'error': 'No relevant content found'}), 404)
+    return relevant_chunks, query_embedding[0], None
+
 
+def _build_messages(query: str, relevant_chunks: List[Dict[str, Any]]) -> List[Dict[str, str]]:
     context = "\n\n".join([chunk['text'] for chunk in relevant_chunks])
-    system_prompt = (
-        "You are a helpful assistant that answers questions based only on the provided context. "
-        "If the answer cannot be found in the context, say \"I cannot find information about that in the uploaded documents.\" "
-        "Be concise and accurate in your responses."
-    )
     user_prompt = f"""Context:
 {context}
 
 Question: {query}
 
 Answer:"""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
 
-    response = openai.chat.completions.create(
+def _complete(messages: List[Dict[str, str]], stream: bool = False):
+    return openai.chat.completions.create(
         model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
+        messages=messages,
         max_tokens=500,
         temperature=0.1,
+        stream=stream,
     )
-    answer = response.choices[0].message.content
 
+
+def _sources(relevant_chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     sources = []
     for chunk in relevant_chunks:
         meta = chunk.get('metadata', {})
+        owner_id = chunk.get('owner_id', '')
         source_info = {
             'filename': meta.get('filename', ''),
             'chunk_index': meta.get('chunk_index', None),
             'score': chunk.get('score', 0),
+            'rrf_score': chunk.get('rrf_score'),
+            'collection_id': owner_id[len(COLLECTION_OWNER_PREFIX):] if owner_id.startswith(COLLECTION_OWNER_PREFIX) else None,
         }
         if source_info not in sources:
             sources.append(source_info)
+    return sources
 
+
+def _record(user_id: str, query: str, answer: str, sources: List[Dict[str, Any]]) -> None:
     try:
         append_user_history(user_id, {
             'timestamp': datetime.now().isoformat(),
@@ -89,7 +91,88 @@ Answer:"""
     except Exception:
         pass
 
-    return jsonify({'answer': answer, 'sources': sources, 'query': query}), 200
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _chat_request():
+    data = request.get_json() or {}
+    query = data.get('query', '')
+    user_id = _get_user_id()
+    if not query:
+        return None, None, (jsonify({'error': 'No query provided'}), 400)
+    if not user_id:
+        return None, None, (jsonify({'error': 'Unauthorized: missing user cookie'}), 401)
+    return query, user_id, None
+
+
+@chat_bp.post('/chat')
+def chat():
+    query, user_id, error = _chat_request()
+    if error:
+        return error
+    relevant_chunks, query_embedding, error = _retrieve(user_id, query)
+    if error:
+        return error
+    chunk_ids = [(chunk['owner_id'], chunk['id']) for chunk in relevant_chunks]
+
+    answer = answer_cache.get(user_id, query, query_embedding, chunk_ids)
+    cached = answer is not None
+    if not cached:
+        with stage_timer('llm'):
+            response = _complete(_build_messages(query, relevant_chunks))
+        answer = response.choices[0].message.content
+        answer_cache.put(user_id, query, query_embedding, chunk_ids, answer)
+    sources = _sources(relevant_chunks)
+    _record(user_id, query, answer, sources)
+
+    return jsonify({'answer': answer, 'sources': sources, 'query': query, 'cached': cached}), 200
+
+
+@chat_bp.post('/chat/stream')
+def chat_stream():
+    query, user_id, error = _chat_request()
+    if error:
+        return error
+    relevant_chunks, query_embedding, error = _retrieve(user_id, query)
+    if error:
+        return error
+    chunk_ids = [(chunk['owner_id'], chunk['id']) for chunk in relevant_chunks]
+    sources = _sources(relevant_chunks)
+    messages = _build_messages(query, relevant_chunks)
+    cached_answer = answer_cache.get(user_id, query, query_embedding, chunk_ids)
+
+    def generate():
+        yield _sse('sources', {'query': query, 'sources': sources})
+        if cached_answer is not None:
+            yield _sse('token', {'text': cached_answer})
+            _record(user_id, query, cached_answer, sources)
+            yield _sse('done', {'answer': cached_answer, 'cached': True})
+            return
+        parts = []
+        started = time.perf_counter()
+        try:
+            for chunk in _complete(messages, stream=True):
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    parts.append(token)
+                    yield _sse('token', {'text': token})
+        except Exception as e:
+            yield _sse('error', {'error': str(e)})
+            return
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage='llm')
+        answer = ''.join(parts)
+        answer_cache.put(user_id, query, query_embedding, chunk_ids, answer)
+        _record(user_id, query, answer, sources)
+        yield _sse('done', {'answer': answer, 'cached': False})
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
 
 
 @chat_bp.get('/history')
@@ -97,7 +180,19 @@ def get_history():
     user_id = _get_user_id()
     if not user_id:
         return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
-    history = read_user_history(user_id)
-    return jsonify({'history': history}), 200
+    try:
+        limit = int(request.args.get('limit', 50))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({'error': 'limit must be at least 1 and offset at least 0'}), 400
+    history, has_more = read_user_history_page(user_id, limit, offset)
+    return jsonify({
+        'history': history,
+        'limit': limit,
+        'offset': offset,
+        'next_offset': offset + len(history) if has_more else None,
+    }), 200
 
 
@@ -0,0 +1,121 @@
+from flask import Blueprint, request, jsonify
+from ..services.collections import (
+    create_collection, get_collection, list_collections, subscribe, unsubscribe, collection_owner_id,
+)
+from ..services.vectors import get_meta_store, remove_user_document
+from ..services.jobs import create_ingest_job
+from ..services.content_store import save_uploaded_files, release_upload
+from ..utils.files import allowed_file
+
+
+collections_bp = Blueprint('collections', __name__)
+
+
+def _get_user_id() -> str:
+    return request.cookies.get('user_id') or request.headers.get('X-User-Id')
+
+
+@collections_bp.get('/collections')
+def get_collections():
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    return jsonify({'collections': list_collections(user_id)}), 200
+
+
+@collections_bp.post('/collections')
+def post_collection():
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    name = ((request.get_json() or {}).get('name') or '').strip()
+    if not name:
+        return jsonify({'error': 'Collection name is required'}), 400
+    collection = create_collection(name, user_id)
+    if collection is None:
+        return jsonify({'error': 'Collection already exists'}), 409
+    subscribe(user_id, collection['collection_id'])
+    return jsonify(collection), 201
+
+
+@collections_bp.post('/collections/<collection_id>/subscription')
+def post_subscription(collection_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    if get_collection(collection_id) is None:
+        return jsonify({'error': 'Collection not found'}), 404
+    subscribe(user_id, collection_id)
+    return jsonify({'collection_id': collection_id, 'subscribed': True}), 200
+
+
+@collections_bp.delete('/collections/<collection_id>/subscription')
+def delete_subscription(collection_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    if not unsubscribe(user_id, collection_id):
+        return jsonify({'error': 'Subscription not found'}), 404
+    return jsonify({'collection_id': collection_id, 'subscribed': False}), 200
+
+
+@collections_bp.post('/collections/<collection_id>/upload')
+def upload_collection_files(collection_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    collection = get_collection(collection_id)
+    if collection is None:
+        return jsonify({'error': 'Collection not found'}), 404
+    if collection['owner_id'] != user_id:
+        return jsonify({'error': 'Only the collection owner can add documents'}), 403
+    if 'files' not in request.files:
+        return jsonify({'error': 'No files provided'}), 400
+
+    files = request.files.getlist('files')
+    for file in files:
+        if not (file and allowed_file(file.filename)):
+            return jsonify({'error': f'File type not allowed: {file.filename}'}), 400
+
+    saved_files = save_uploaded_files(files)
+    job_id = create_ingest_job(user_id, saved_files, owner_id=collection_owner_id(collection_id))
+    files_info = [{'file_id': f['file_id'], 'filename': f['filename'], 'duplicate': f['duplicate']} for f in saved_files]
+    return jsonify({
+        'message': f'Queued {len(saved_files)} files for processing',
+        'collection_id': collection_id,
+        'job_id': job_id,
+        'status': 'queued',
+        'files': files_info,
+    }), 202
+
+
+@collections_bp.get('/collections/<collection_id>/documents')
+def get_collection_documents(collection_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    if get_collection(collection_id) is None:
+        return jsonify({'error': 'Collection not found'}), 404
+    store = get_meta_store(collection_owner_id(collection_id))
+    if not store.exists():
+        return jsonify({'documents': []}), 200
+    return jsonify({'documents': store.list_documents()}), 200
+
+
+@collections_bp.delete('/collections/<collection_id>/documents/<file_id>')
+def delete_collection_document(collection_id, file_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    collection = get_collection(collection_id)
+    if collection is None:
+        return jsonify({'error': 'Collection not found'}), 404
+    if collection['owner_id'] != user_id:
+        return jsonify({'error': 'Only the collection owner can remove documents'}), 403
+    document = remove_user_document(collection_owner_id(collection_id), file_id)
+    if document is None:
+        return jsonify({'error': 'Document not found'}), 404
+
+    release_upload(document['file_path'])
+
+    return jsonify({'message': 'Document deleted successfully'}), 200
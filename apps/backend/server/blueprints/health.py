@@ -1,5 +1,11 @@
 from flask import Blueprint, jsonify
 from datetime import datetime
+from ..services.index_cache import index_cache
+from ..services.answer_cache import answer_cache
+from ..services.embeddings import embedding_service
+from ..services.embedding_client import get_embedding_client
+from ..services.vectors import embedding_cache_stats
+from ..utils.startup import startup_timings
 
 
 health_bp = Blueprint('health', __name__)
@@ -10,3 +16,23 @@ def health_check():
     return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat(), 'version': '1.0.0'}), 200
 
 
+def _sidecar_stats():
+    client = get_embedding_client()
+    if client is None:
+        return None
+    try:
+        return client.stats()
+    except Exception as e:
+        return {'error': f'Embedding server unavailable: {e}'}
+
+
+@health_bp.get('/stats')
+def stats():
+    return jsonify({
+        'index_cache': index_cache.stats(),
+        'embedding_cache': embedding_cache_stats(),
+        'embeddings': embedding_service.stats(),
+        'answer_cache': answer_cache.stats(),
+        'startup': startup_timings(),
+        'sidecar': _sidecar_stats(),
+    }), 200
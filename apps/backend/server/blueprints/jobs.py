@@ -0,0 +1,20 @@
+from flask import Blueprint, request, jsonify
+from ..services.jobs import get_job
+
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def _get_user_id() -> str:
+    return request.cookies.get('user_id') or request.headers.get('X-User-Id')
+
+
+@jobs_bp.get('/jobs/<job_id>')
+def get_job_status(job_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    job = get_job(job_id)
+    if job is None or job['user_id'] != user_id:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
@@ -0,0 +1,84 @@
+import os
+import re
+import time
+import cProfile
+import logging
+from datetime import datetime
+from flask import Blueprint, Response, g, request
+from ..config import Config
+from ..services.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, SLOW_REQUEST_PROFILES, render_registry, render_samples
+from ..services.answer_cache import answer_cache
+from ..services.index_cache import index_cache
+from ..services.vectors import embedding_cache_stats
+
+
+metrics_bp = Blueprint('metrics', __name__)
+logger = logging.getLogger(__name__)
+
+
+def _endpoint() -> str:
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+@metrics_bp.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.profiler = None
+    if Config.PROFILE_SLOW_REQUEST_MS > 0:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another request already holds the interpreter's profiler.
+            return
+        g.profiler = profiler
+
+
+@metrics_bp.after_app_request
+def record_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = _endpoint()
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    HTTP_REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        if elapsed * 1000 >= Config.PROFILE_SLOW_REQUEST_MS:
+            _dump_profile(profiler, endpoint, elapsed)
+    return response
+
+
+def _dump_profile(profiler: cProfile.Profile, endpoint: str, elapsed: float) -> None:
+    os.makedirs(Config.PROFILE_FOLDER, exist_ok=True)
+    name = re.sub(r'[^A-Za-z0-9]+', '_', endpoint).strip('_') or 'root'
+    path = os.path.join(
+        Config.PROFILE_FOLDER,
+        f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_{request.method}_{name}_{int(elapsed * 1000)}ms.prof",
+    )
+    try:
+        profiler.dump_stats(path)
+        SLOW_REQUEST_PROFILES.inc(endpoint=endpoint)
+    except OSError:
+        logger.exception('Could not write request profile to %s', path)
+
+
+@metrics_bp.get('/metrics')
+def metrics():
+    caches = {'answer': answer_cache.stats(), 'index': index_cache.stats()}
+    embedding_cache = embedding_cache_stats()
+    if embedding_cache is not None:
+        caches['embedding'] = embedding_cache
+    lines = render_registry()
+    for name, field, kind, documentation in (
+        ('docbot_cache_hits_total', 'hits', 'counter', 'Cache hits.'),
+        ('docbot_cache_misses_total', 'misses', 'counter', 'Cache misses.'),
+        ('docbot_cache_evictions_total', 'evictions', 'counter', 'Cache evictions.'),
+        ('docbot_cache_entries', 'entries', 'gauge', 'Entries currently cached.'),
+    ):
+        samples = [({'cache': cache}, stats[field]) for cache, stats in caches.items() if field in stats]
+        lines.extend(render_samples(name, kind, documentation, samples))
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,117 @@
+from flask import Blueprint, request, jsonify
+from ..config import Config
+from ..services.chunked_uploads import (
+    UploadConflict, create_session, get_session, list_sessions, write_part, complete_session, abort_session,
+)
+from ..services.jobs import create_ingest_job
+from ..utils.files import allowed_file
+
+
+uploads_bp = Blueprint('uploads', __name__)
+
+
+def _get_user_id() -> str:
+    return request.cookies.get('user_id') or request.headers.get('X-User-Id')
+
+
+@uploads_bp.post('/uploads')
+def post_upload_session():
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    data = request.get_json() or {}
+    filename = data.get('filename') or ''
+    if not allowed_file(filename):
+        return jsonify({'error': f'File type not allowed: {filename}'}), 400
+    part_size = data.get('part_size')
+    try:
+        size = int(data.get('size'))
+        part_size = Config.UPLOAD_PART_SIZE if part_size is None else int(part_size)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'size and part_size must be integers'}), 400
+    if not 0 < size <= Config.CHUNKED_UPLOAD_MAX_BYTES:
+        return jsonify({'error': f'size must be between 1 and {Config.CHUNKED_UPLOAD_MAX_BYTES} bytes'}), 400
+    if not 0 < part_size <= Config.MAX_CONTENT_LENGTH:
+        return jsonify({'error': f'part_size must be between 1 and {Config.MAX_CONTENT_LENGTH} bytes'}), 400
+    return jsonify(create_session(user_id, filename, size, part_size)), 201
+
+
+@uploads_bp.get('/uploads')
+def get_upload_sessions():
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    return jsonify({'uploads': list_sessions(user_id)}), 200
+
+
+@uploads_bp.get('/uploads/<upload_id>')
+def get_upload_session(upload_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    session = get_session(user_id, upload_id)
+    if session is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(session), 200
+
+
+@uploads_bp.put('/uploads/<upload_id>/parts/<int:index>')
+def put_upload_part(upload_id, index):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    session = get_session(user_id, upload_id)
+    if session is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    if request.content_length is None:
+        return jsonify({'error': 'Content-Length is required'}), 411
+    try:
+        part = write_part(session, index, request.stream, request.content_length)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except UploadConflict as e:
+        return jsonify({'error': str(e)}), 409
+    except FileNotFoundError:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(part), 200
+
+
+@uploads_bp.post('/uploads/<upload_id>/complete')
+def post_upload_complete(upload_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    session = get_session(user_id, upload_id)
+    if session is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    try:
+        saved, claimed = complete_session(session, (request.get_json(silent=True) or {}).get('sha256'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except UploadConflict as e:
+        return jsonify({'error': str(e)}), 409
+    except FileNotFoundError:
+        return jsonify({'error': 'Upload not found'}), 404
+    if claimed:
+        create_ingest_job(user_id, [saved], job_id=saved['job_id'])
+    return jsonify({
+        'message': 'Queued 1 files for processing',
+        'user_id': user_id,
+        'job_id': saved['job_id'],
+        'status': 'queued',
+        'files': [{'file_id': saved['file_id'], 'filename': saved['filename']}],
+    }), 202
+
+
+@uploads_bp.delete('/uploads/<upload_id>')
+def delete_upload_session(upload_id):
+    user_id = _get_user_id()
+    if not user_id:
+        return jsonify({'error': 'Unauthorized: missing user cookie'}), 401
+    session = get_session(user_id, upload_id)
+    if session is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    if session['status'] != 'uploading':
+        return jsonify({'error': 'Upload is already being completed'}), 409
+    abort_session(upload_id)
+    return jsonify({'message': 'Upload aborted'}), 200
@@ -8,11 +8,59 @@ class Config:
     UPLOAD_FOLDER = 'uploads'
     VECTOR_DB_FOLDER = 'vector_db'
     HISTORY_FOLDER = 'histories'
+    HISTORY_LIMIT = 500
+    HISTORY_COMPACT_MIN_BYTES = int(os.getenv('HISTORY_COMPACT_MIN_BYTES', 256 * 1024))
     USERS_FILE = 'users.json'
+    USERS_DB = 'users.sqlite'
+    JOBS_DB = 'jobs.sqlite'
+    JOB_WORKERS_FOLDER = 'job_workers'
+    COLLECTIONS_DB = 'collections.sqlite'
+    CONTENT_DB = 'content.sqlite'
+    INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', 2))
+    INGEST_WINDOW_CHUNKS = int(os.getenv('INGEST_WINDOW_CHUNKS', 512))
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+    UPLOAD_PART_SIZE = int(os.getenv('UPLOAD_PART_SIZE', 8 * 1024 * 1024))
+    CHUNKED_UPLOAD_MAX_BYTES = int(os.getenv('CHUNKED_UPLOAD_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+    UPLOAD_SESSION_TTL_HOURS = float(os.getenv('UPLOAD_SESSION_TTL_HOURS', 24))
     ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx', 'doc'}
+    PDF_EXTRACT_PROCESSES = int(os.getenv('PDF_EXTRACT_PROCESSES', 0))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 64))
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 16))
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
+    CHUNK_SIZE_UNIT = os.getenv('CHUNK_SIZE_UNIT', 'tokens')
+    CHUNK_TOKENS = int(os.getenv('CHUNK_TOKENS', 256))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv('CHUNK_OVERLAP_TOKENS', 48))
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')
     EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', 64))
+    EMBEDDING_BATCH_WAIT_MS = float(os.getenv('EMBEDDING_BATCH_WAIT_MS', 0))
+    EMBEDDING_PROCESSES = int(os.getenv('EMBEDDING_PROCESSES', 0))
+    EMBEDDING_TIMEOUT = float(os.getenv('EMBEDDING_TIMEOUT', 120))
+    PRELOAD_EMBEDDING_MODEL = int(os.getenv('PRELOAD_EMBEDDING_MODEL', 0))
+    EMBEDDING_SERVER_URL = os.getenv('EMBEDDING_SERVER_URL', '')
+    EMBEDDING_SERVER_TIMEOUT = float(os.getenv('EMBEDDING_SERVER_TIMEOUT', 30))
+    PROFILE_SLOW_REQUEST_MS = float(os.getenv('PROFILE_SLOW_REQUEST_MS', 0))
+    PROFILE_FOLDER = os.getenv('PROFILE_FOLDER', 'profiles')
+    EMBEDDING_CACHE_FOLDER = 'embedding_cache'
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', 100000))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', 10000))
+    ANSWER_CACHE_TTL_SECONDS = float(os.getenv('ANSWER_CACHE_TTL_SECONDS', 3600))
+    ANSWER_CACHE_SIMILARITY = float(os.getenv('ANSWER_CACHE_SIMILARITY', 0.95))
+    HYBRID_SEARCH = int(os.getenv('HYBRID_SEARCH', 1))
+    HYBRID_CANDIDATES = int(os.getenv('HYBRID_CANDIDATES', 20))
+    RRF_K = int(os.getenv('RRF_K', 60))
+    KEYWORD_MAX_TERM_DOCS = int(os.getenv('KEYWORD_MAX_TERM_DOCS', 500))
+    VECTOR_INDEX_TYPE = os.getenv('VECTOR_INDEX_TYPE', 'auto')
+    ANN_MIN_VECTORS = int(os.getenv('ANN_MIN_VECTORS', 50000))
+    ANN_PQ_MIN_VECTORS = int(os.getenv('ANN_PQ_MIN_VECTORS', 1000000))
+    IVF_NLIST = int(os.getenv('IVF_NLIST', 0))
+    IVF_NPROBE = int(os.getenv('IVF_NPROBE', 16))
+    HNSW_M = int(os.getenv('HNSW_M', 32))
+    HNSW_EF_CONSTRUCTION = int(os.getenv('HNSW_EF_CONSTRUCTION', 80))
+    HNSW_EF_SEARCH = int(os.getenv('HNSW_EF_SEARCH', 64))
+    PQ_SUBQUANTIZERS = int(os.getenv('PQ_SUBQUANTIZERS', 48))
+    INDEX_CACHE_MAX_BYTES = int(os.getenv('INDEX_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    INDEX_MMAP = int(os.getenv('INDEX_MMAP', 1))
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-me')
@@ -0,0 +1,141 @@
+import time
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Hashable, Optional, Sequence, Set, Tuple
+import numpy as np
+from ..config import Config
+from .embedding_cache import normalize_text
+
+
+ContextKey = Tuple[str, Tuple[Hashable, ...]]
+
+
+class AnswerCache:
+    """Per-user LRU cache of LLM answers.
+
+    An answer is only reused for the same retrieved chunk ids, either for the
+    same normalised question or for one whose embedding is at least
+    ``threshold`` cosine-similar. Entries expire after ``ttl_seconds`` and a
+    user's entries are dropped whenever their documents change in this
+    process. Other workers stay correct because chunk ids are never reused
+    (``MetaStore`` keeps ``next_id`` even when every document is deleted),
+    so changed documents retrieve ids no cached entry was stored under.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: 'OrderedDict[Tuple[str, Tuple[Hashable, ...], str], Dict[str, Any]]' = OrderedDict()
+        self._contexts: Dict[ContextKey, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str, query: str, embedding: np.ndarray, chunk_ids: Sequence[Hashable]) -> Optional[str]:
+        if self.max_entries <= 0:
+            return None
+        context = (user_id, tuple(chunk_ids))
+        text = normalize_text(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lookup(context, text, now)
+            if entry is not None:
+                self.exact_hits += 1
+                return entry['answer']
+            best, best_score = None, self.threshold
+            for candidate in list(self._contexts.get(context, ())):
+                entry = self._lookup(context, candidate, now)
+                if entry is None:
+                    continue
+                score = float(np.dot(entry['embedding'], embedding))
+                if score >= best_score:
+                    best, best_score = entry, score
+            if best is not None:
+                self.similar_hits += 1
+                return best['answer']
+            self.misses += 1
+            return None
+
+    def put(self, user_id: str, query: str, embedding: np.ndarray, chunk_ids: Sequence[Hashable], answer: str) -> None:
+        if self.max_entries <= 0:
+            return
+        context = (user_id, tuple(chunk_ids))
+        text = normalize_text(query)
+        key = context + (text,)
+        with self._lock:
+            self._entries[key] = {
+                'answer': answer,
+                'embedding': np.asarray(embedding, dtype='float32').reshape(-1),
+                'expires': time.monotonic() + self.ttl_seconds,
+            }
+            self._entries.move_to_end(key)
+            self._contexts[context].add(text)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            contexts = [context for context in self._contexts if context[0] == user_id]
+            for context in contexts:
+                for text in list(self._contexts[context]):
+                    self._discard(context + (text,))
+            if contexts:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._contexts.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                'hits': hits,
+                'exact_hits': self.exact_hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'threshold': self.threshold,
+            }
+
+    def _lookup(self, context: ContextKey, text: str, now: float) -> Optional[Dict[str, Any]]:
+        key = context + (text,)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry['expires'] <= now:
+            self._discard(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _discard(self, key: Tuple[str, Tuple[Hashable, ...], str]) -> None:
+        self._entries.pop(key, None)
+        context = key[:2]
+        texts = self._contexts.get(context)
+        if texts is not None:
+            texts.discard(key[2])
+            if not texts:
+                del self._contexts[context]
+
+
+answer_cache = AnswerCache(
+    Config.ANSWER_CACHE_MAX_ENTRIES,
+    Config.ANSWER_CACHE_TTL_SECONDS,
+    Config.ANSWER_CACHE_SIMILARITY,
+)
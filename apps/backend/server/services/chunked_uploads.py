@@ -0,0 +1,326 @@
+import os
+import uuid
+import hashlib
+import sqlite3
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, BinaryIO, Tuple
+from werkzeug.utils import secure_filename
+from ..config import Config
+from ..utils.locks import FileLocks
+from .content_store import READ_SIZE, blob_path, store_blob
+from .metrics import stage_timer
+
+
+_schema_ready = False
+# Serialises part writes with the completion claim and with discarding the session.
+_session_locks = FileLocks(lambda: Config.UPLOAD_FOLDER)
+
+
+def _connect() -> sqlite3.Connection:
+    global _schema_ready
+    conn = sqlite3.connect(Config.CONTENT_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS upload_sessions (
+                upload_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                part_size INTEGER NOT NULL,
+                part_count INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS upload_parts (
+                upload_id TEXT NOT NULL,
+                part_index INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (upload_id, part_index)
+            ) WITHOUT ROWID;
+        """)
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(upload_sessions)')}
+        for column, definition in (
+            ('updated_at', 'TEXT'),
+            ('status', "TEXT NOT NULL DEFAULT 'uploading'"),
+            ('job_id', 'TEXT'),
+            ('file_id', 'TEXT'),
+            ('expected_sha256', 'TEXT'),
+            ('content_hash', 'TEXT'),
+            ('blob_path', 'TEXT'),
+        ):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE upload_sessions ADD COLUMN {column} {definition}')
+        _schema_ready = True
+    return conn
+
+
+def _session_path(upload_id: str) -> str:
+    return os.path.join(Config.UPLOAD_FOLDER, f".{upload_id}.upload")
+
+
+def _lock_key(upload_id: str) -> str:
+    return f".{upload_id}"
+
+
+def part_length(session: Dict[str, Any], index: int) -> int:
+    return min(session['part_size'], session['size'] - index * session['part_size'])
+
+
+def _describe(conn: sqlite3.Connection, session: sqlite3.Row) -> Dict[str, Any]:
+    received = [row['part_index'] for row in conn.execute(
+        'SELECT part_index FROM upload_parts WHERE upload_id = ? ORDER BY part_index', (session['upload_id'],),
+    )]
+    info = dict(session)
+    info['received_parts'] = received
+    info['missing_parts'] = sorted(set(range(session['part_count'])) - set(received))
+    return info
+
+
+def _expire_sessions(conn: sqlite3.Connection) -> None:
+    cutoff = (datetime.now() - timedelta(hours=Config.UPLOAD_SESSION_TTL_HOURS)).isoformat()
+    expired = [row['upload_id'] for row in conn.execute(
+        "SELECT upload_id FROM upload_sessions WHERE (status = 'uploading' OR blob_path IS NOT NULL) "
+        "AND COALESCE(updated_at, created_at) < ?",
+        (cutoff,),
+    )]
+    for upload_id in expired:
+        _discard(conn, upload_id)
+
+
+def _discard(conn: sqlite3.Connection, upload_id: str) -> None:
+    with _session_locks(_lock_key(upload_id)):
+        with conn:
+            conn.execute('DELETE FROM upload_parts WHERE upload_id = ?', (upload_id,))
+            conn.execute('DELETE FROM upload_sessions WHERE upload_id = ?', (upload_id,))
+        for path in (_session_path(upload_id), os.path.join(Config.UPLOAD_FOLDER, f"{_lock_key(upload_id)}.lock")):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def create_session(user_id: str, filename: str, size: int, part_size: int) -> Dict[str, Any]:
+    session = {
+        'upload_id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'filename': secure_filename(filename),
+        'size': size,
+        'part_size': part_size,
+        'part_count': max(1, -(-size // part_size)),
+        'created_at': datetime.now().isoformat(),
+        'status': 'uploading',
+    }
+    session['updated_at'] = session['created_at']
+    with open(_session_path(session['upload_id']), 'wb') as f:
+        f.truncate(size)
+    conn = _connect()
+    try:
+        _expire_sessions(conn)
+        with conn:
+            conn.execute(
+                'INSERT INTO upload_sessions '
+                '(upload_id, user_id, filename, size, part_size, part_count, created_at, updated_at, status) '
+                'VALUES (:upload_id, :user_id, :filename, :size, :part_size, :part_count, :created_at, :updated_at, '
+                ':status)',
+                session,
+            )
+    finally:
+        conn.close()
+    return dict(session, job_id=None, file_id=None, expected_sha256=None, content_hash=None, blob_path=None,
+                received_parts=[], missing_parts=list(range(session['part_count'])))
+
+
+def get_session(user_id: str, upload_id: str) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        row = conn.execute(
+            'SELECT * FROM upload_sessions WHERE upload_id = ? AND user_id = ?', (upload_id, user_id),
+        ).fetchone()
+        return _describe(conn, row) if row else None
+    finally:
+        conn.close()
+
+
+class UploadConflict(Exception):
+    """The session is being completed, so its parts can no longer change."""
+
+
+def _check_uploading(conn: sqlite3.Connection, upload_id: str) -> None:
+    row = conn.execute('SELECT status FROM upload_sessions WHERE upload_id = ?', (upload_id,)).fetchone()
+    if row is None:
+        raise FileNotFoundError(upload_id)
+    if row['status'] != 'uploading':
+        raise UploadConflict('Upload is already being completed')
+
+
+def write_part(session: Dict[str, Any], index: int, stream: BinaryIO, length: int) -> Dict[str, Any]:
+    if session['status'] != 'uploading':
+        raise UploadConflict('Upload is already being completed')
+    if not 0 <= index < session['part_count']:
+        raise ValueError(f"Part index must be between 0 and {session['part_count'] - 1}")
+    expected = part_length(session, index)
+    if length != expected:
+        raise ValueError(f"Part {index} must be exactly {expected} bytes, got {length}")
+
+    upload_id = session['upload_id']
+    conn = _connect()
+    try:
+        # Holding the session lock from the status check to the part row keeps
+        # complete from claiming, and the job from hashing, a file still being written.
+        with _session_locks(_lock_key(upload_id)):
+            _check_uploading(conn, upload_id)
+            digest = hashlib.sha256()
+            remaining = expected
+            with stage_timer('upload_save'), open(_session_path(upload_id), 'r+b') as f:
+                f.seek(index * session['part_size'])
+                while remaining:
+                    block = stream.read(min(READ_SIZE, remaining))
+                    if not block:
+                        break
+                    digest.update(block)
+                    f.write(block)
+                    remaining -= len(block)
+            if remaining:
+                raise ValueError(f"Part {index} ended after {expected - remaining} of {expected} bytes")
+
+            part = {'upload_id': upload_id, 'part_index': index, 'size': expected, 'sha256': digest.hexdigest()}
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO upload_parts (upload_id, part_index, size, sha256) '
+                    'VALUES (:upload_id, :part_index, :size, :sha256)',
+                    part,
+                )
+                conn.execute(
+                    'UPDATE upload_sessions SET updated_at = ? WHERE upload_id = ?',
+                    (datetime.now().isoformat(), upload_id),
+                )
+    finally:
+        conn.close()
+    return part
+
+
+def complete_session(session: Dict[str, Any], expected_sha256: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+    """Claim ``session`` for ingestion and return its file entry and whether this call claimed it.
+
+    Only the first call claims the session; later calls return the same
+    ``job_id`` and ``file_id``. Hashing the assembled file is left to the
+    ingest job (``finish_upload``) so the request does not read it back.
+    """
+    if session['missing_parts']:
+        raise ValueError(f"Missing parts: {session['missing_parts'][:20]}")
+    job_id, file_id = str(uuid.uuid4()), str(uuid.uuid4())
+    conn = _connect()
+    try:
+        with _session_locks(_lock_key(session['upload_id'])), conn:
+            claimed = conn.execute(
+                "UPDATE upload_sessions SET status = 'completing', job_id = ?, file_id = ?, expected_sha256 = ?, "
+                "updated_at = ? WHERE upload_id = ? AND status = 'uploading'",
+                (job_id, file_id, expected_sha256.lower() if expected_sha256 else None, datetime.now().isoformat(),
+                 session['upload_id']),
+            ).rowcount
+        if not claimed:
+            row = conn.execute(
+                'SELECT job_id, file_id FROM upload_sessions WHERE upload_id = ?', (session['upload_id'],),
+            ).fetchone()
+            if row is None:
+                # The ingest job already finished it and dropped the session.
+                raise FileNotFoundError(session['upload_id'])
+            if row['job_id'] is None:
+                raise UploadConflict('Upload is no longer available')
+            job_id, file_id = row['job_id'], row['file_id']
+    finally:
+        conn.close()
+    return {
+        'job_id': job_id,
+        'file_id': file_id,
+        'filename': session['filename'],
+        'file_path': _session_path(session['upload_id']),
+        'upload_id': session['upload_id'],
+    }, bool(claimed)
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finish_upload(upload_id: str) -> Tuple[str, str]:
+    """Hash a completed upload and move it into the content store.
+
+    Returns ``(file_path, content_hash)``; the caller drops the session with
+    ``abort_session`` once it has recorded them. Calling it again for the same
+    session, e.g. from a job resumed after a crash, returns the blob already
+    stored for it without taking another reference. On a SHA-256 mismatch the
+    session goes back to 'uploading' so the client can re-send parts and
+    complete again.
+    """
+    conn = _connect()
+    try:
+        session = conn.execute('SELECT * FROM upload_sessions WHERE upload_id = ?', (upload_id,)).fetchone()
+    finally:
+        conn.close()
+    if session is None:
+        raise ValueError('Upload session no longer exists')
+    if session['blob_path']:
+        return session['blob_path'], session['content_hash']
+
+    path = _session_path(upload_id)
+    extension = session['filename'].rsplit('.', 1)[1].lower()
+    content_hash = session['content_hash']
+    if content_hash is None:
+        content_hash = _hash_file(path)
+        expected_sha256 = session['expected_sha256']
+        conn = _connect()
+        try:
+            with conn:
+                if expected_sha256 and expected_sha256 != content_hash:
+                    conn.execute(
+                        "UPDATE upload_sessions SET status = 'uploading', job_id = NULL, file_id = NULL, "
+                        "expected_sha256 = NULL, updated_at = ? WHERE upload_id = ?",
+                        (datetime.now().isoformat(), upload_id),
+                    )
+                else:
+                    conn.execute(
+                        'UPDATE upload_sessions SET content_hash = ? WHERE upload_id = ?', (content_hash, upload_id),
+                    )
+        finally:
+            conn.close()
+        if expected_sha256 and expected_sha256 != content_hash:
+            raise ValueError(f"SHA-256 mismatch: expected {expected_sha256}, assembled file is {content_hash}")
+    elif not os.path.exists(path):
+        # An earlier attempt moved the file into place but died before its reference was committed.
+        path = blob_path(content_hash, extension)
+
+    def mark_stored(conn: sqlite3.Connection, file_path: str) -> None:
+        conn.execute(
+            'UPDATE upload_sessions SET blob_path = ?, updated_at = ? WHERE upload_id = ?',
+            (file_path, datetime.now().isoformat(), upload_id),
+        )
+
+    file_path, _ = store_blob(path, content_hash, session['size'], extension, on_stored=mark_stored)
+    return file_path, content_hash
+
+
+def abort_session(upload_id: str) -> None:
+    conn = _connect()
+    try:
+        _discard(conn, upload_id)
+    finally:
+        conn.close()
+
+
+def list_sessions(user_id: str) -> List[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            'SELECT * FROM upload_sessions WHERE user_id = ? ORDER BY created_at', (user_id,),
+        ).fetchall()
+        return [_describe(conn, row) for row in rows]
+    finally:
+        conn.close()
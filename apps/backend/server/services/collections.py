@@ -0,0 +1,113 @@
+import uuid
+import sqlite3
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from ..config import Config
+
+
+COLLECTION_OWNER_PREFIX = 'collection_'
+
+_schema_ready = False
+
+
+def _connect() -> sqlite3.Connection:
+    global _schema_ready
+    conn = sqlite3.connect(Config.COLLECTIONS_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS collections (
+                collection_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                owner_id TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                user_id TEXT NOT NULL,
+                collection_id TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, collection_id)
+            ) WITHOUT ROWID;
+        """)
+        _schema_ready = True
+    return conn
+
+
+def collection_owner_id(collection_id: str) -> str:
+    return f"{COLLECTION_OWNER_PREFIX}{collection_id}"
+
+
+def create_collection(name: str, owner_id: str) -> Optional[Dict[str, Any]]:
+    collection = {
+        'collection_id': str(uuid.uuid4()),
+        'name': name,
+        'owner_id': owner_id,
+        'created_at': datetime.now().isoformat(),
+    }
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                'INSERT INTO collections (collection_id, name, owner_id, created_at) VALUES (?, ?, ?, ?)',
+                (collection['collection_id'], name, owner_id, collection['created_at']),
+            )
+    except sqlite3.IntegrityError:
+        return None
+    finally:
+        conn.close()
+    return collection
+
+
+def get_collection(collection_id: str) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        row = conn.execute('SELECT * FROM collections WHERE collection_id = ?', (collection_id,)).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+def list_collections(user_id: str) -> List[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        rows = conn.execute(
+            'SELECT c.*, s.user_id IS NOT NULL AS subscribed FROM collections c '
+            'LEFT JOIN subscriptions s ON s.collection_id = c.collection_id AND s.user_id = ? ORDER BY c.name',
+            (user_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(row, subscribed=bool(row['subscribed'])) for row in rows]
+
+
+def subscribe(user_id: str, collection_id: str) -> None:
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                'INSERT OR IGNORE INTO subscriptions (user_id, collection_id, created_at) VALUES (?, ?, ?)',
+                (user_id, collection_id, datetime.now().isoformat()),
+            )
+    finally:
+        conn.close()
+
+
+def unsubscribe(user_id: str, collection_id: str) -> bool:
+    conn = _connect()
+    try:
+        with conn:
+            return conn.execute(
+                'DELETE FROM subscriptions WHERE user_id = ? AND collection_id = ?', (user_id, collection_id),
+            ).rowcount > 0
+    finally:
+        conn.close()
+
+
+def subscribed_owner_ids(user_id: str) -> List[str]:
+    conn = _connect()
+    try:
+        rows = conn.execute('SELECT collection_id FROM subscriptions WHERE user_id = ?', (user_id,)).fetchall()
+    finally:
+        conn.close()
+    return [collection_owner_id(row['collection_id']) for row in rows]
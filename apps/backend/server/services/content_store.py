@@ -0,0 +1,202 @@
+import os
+import json
+import uuid
+import hashlib
+import sqlite3
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+import numpy as np
+from werkzeug.utils import secure_filename
+from ..config import Config
+from .metrics import stage_timer
+
+
+READ_SIZE = 64 * 1024
+
+_schema_ready = False
+
+
+def _connect() -> sqlite3.Connection:
+    global _schema_ready
+    conn = sqlite3.connect(Config.CONTENT_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                content_hash TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobs_file_path ON blobs (file_path);
+            DROP TABLE IF EXISTS artifacts;
+            CREATE TABLE IF NOT EXISTS artifact_batches (
+                content_hash TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                chunks TEXT NOT NULL,
+                vectors BLOB NOT NULL,
+                dimension INTEGER NOT NULL,
+                PRIMARY KEY (content_hash, signature, seq)
+            );
+            CREATE TABLE IF NOT EXISTS artifact_sets (
+                content_hash TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                batches INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (content_hash, signature)
+            );
+        """)
+        _schema_ready = True
+    return conn
+
+
+def blob_path(content_hash: str, extension: str) -> str:
+    return os.path.join(Config.UPLOAD_FOLDER, f"{content_hash}.{extension}")
+
+
+def store_blob(temp_path: str, content_hash: str, size: int, extension: str,
+               on_stored: Optional[Callable[[sqlite3.Connection, str], None]] = None) -> Tuple[str, bool]:
+    final_path = blob_path(content_hash, extension)
+    conn = _connect()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        with conn:
+            row = conn.execute('SELECT file_path, refcount FROM blobs WHERE content_hash = ?', (content_hash,)).fetchone()
+            if row is not None and os.path.exists(row['file_path']):
+                conn.execute('UPDATE blobs SET refcount = refcount + 1 WHERE content_hash = ?', (content_hash,))
+                duplicate, final_path = True, row['file_path']
+            else:
+                if temp_path != final_path:
+                    os.replace(temp_path, final_path)
+                conn.execute(
+                    'INSERT INTO blobs (content_hash, file_path, size, refcount, created_at) VALUES (?, ?, ?, 1, ?) '
+                    'ON CONFLICT(content_hash) DO UPDATE SET file_path = excluded.file_path, refcount = refcount + 1',
+                    (content_hash, final_path, size, datetime.now().isoformat()),
+                )
+                duplicate = False
+            if on_stored:
+                # Commits together with the reference, so the caller can tell it was taken.
+                on_stored(conn, final_path)
+    finally:
+        conn.close()
+    if duplicate and temp_path != final_path:
+        os.remove(temp_path)
+    return final_path, duplicate
+
+
+def save_uploaded_files(files) -> List[Dict[str, Any]]:
+    saved_files = []
+    for file in files:
+        filename = secure_filename(file.filename)
+        temp_path = os.path.join(Config.UPLOAD_FOLDER, f".{uuid.uuid4()}.part")
+        digest = hashlib.sha256()
+        size = 0
+        with stage_timer('upload_save'), open(temp_path, 'wb') as out:
+            while True:
+                block = file.stream.read(READ_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+                out.write(block)
+                size += len(block)
+        content_hash = digest.hexdigest()
+        extension = filename.rsplit('.', 1)[1].lower()
+        file_path, duplicate = store_blob(temp_path, content_hash, size, extension)
+        saved_files.append({
+            'file_id': str(uuid.uuid4()),
+            'filename': filename,
+            'file_path': file_path,
+            'content_hash': content_hash,
+            'duplicate': duplicate,
+        })
+    return saved_files
+
+
+def release_upload(file_path: str) -> None:
+    conn = _connect()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        with conn:
+            row = conn.execute('SELECT content_hash, refcount FROM blobs WHERE file_path = ?', (file_path,)).fetchone()
+            if row is not None and row['refcount'] > 1:
+                conn.execute('UPDATE blobs SET refcount = refcount - 1 WHERE content_hash = ?', (row['content_hash'],))
+                return
+            if row is not None:
+                conn.execute('DELETE FROM blobs WHERE content_hash = ?', (row['content_hash'],))
+                conn.execute('DELETE FROM artifact_sets WHERE content_hash = ?', (row['content_hash'],))
+                conn.execute('DELETE FROM artifact_batches WHERE content_hash = ?', (row['content_hash'],))
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    finally:
+        conn.close()
+
+
+def artifact_signature(max_size: int, overlap: int) -> str:
+    return f"{Config.EMBEDDING_MODEL}|{Config.CHUNK_SIZE_UNIT}|{max_size}|{overlap}"
+
+
+def get_artifacts(content_hash: str, signature: str) -> Optional[Iterator[Tuple[List[Dict[str, Any]], np.ndarray]]]:
+    # Only a set closed by finish_artifacts counts, so a file whose ingest
+    # died part way is processed again rather than linked truncated.
+    conn = _connect()
+    try:
+        row = conn.execute(
+            'SELECT batches FROM artifact_sets WHERE content_hash = ? AND signature = ?', (content_hash, signature),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        return None
+    return _iter_artifact_batches(content_hash, signature, row['batches'])
+
+
+def _iter_artifact_batches(content_hash: str, signature: str,
+                           batches: int) -> Iterator[Tuple[List[Dict[str, Any]], np.ndarray]]:
+    conn = _connect()
+    try:
+        for seq in range(batches):
+            row = conn.execute(
+                'SELECT chunks, vectors, dimension FROM artifact_batches WHERE content_hash = ? AND signature = ? AND seq = ?',
+                (content_hash, signature, seq),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Stored artifacts for {content_hash} are missing batch {seq}")
+            vectors = np.frombuffer(row['vectors'], dtype='float32').reshape(-1, row['dimension'])
+            yield json.loads(row['chunks']), vectors.copy()
+    finally:
+        conn.close()
+
+
+def put_artifacts(content_hash: str, signature: str, seq: int, chunks: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO artifact_batches (content_hash, signature, seq, chunks, vectors, dimension) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    content_hash, signature, seq, json.dumps(chunks, ensure_ascii=False),
+                    np.ascontiguousarray(vectors, dtype='float32').tobytes(), vectors.shape[1],
+                ),
+            )
+    finally:
+        conn.close()
+
+
+def finish_artifacts(content_hash: str, signature: str, batches: int) -> None:
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                'DELETE FROM artifact_batches WHERE content_hash = ? AND signature = ? AND seq >= ?',
+                (content_hash, signature, batches),
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO artifact_sets (content_hash, signature, batches, created_at) VALUES (?, ?, ?, ?)',
+                (content_hash, signature, batches, datetime.now().isoformat()),
+            )
+    finally:
+        conn.close()
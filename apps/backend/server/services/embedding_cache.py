@@ -0,0 +1,158 @@
+import os
+import re
+import time
+import sqlite3
+import zlib
+import hashlib
+import threading
+import unicodedata
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+
+TOUCH_BATCH = 1000
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def embedding_key(text: str, model_name: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store shared by all users and processes.
+
+    Vectors live in a fixed-capacity memory-mapped float32 matrix; a small
+    SQLite table maps each content hash to its row, a checksum of the vector
+    and its last use, so the least recently used rows are recycled once the
+    cache is full. Both files are named after the dimension and capacity, so
+    changing either starts a fresh cache instead of reading stale slots.
+    """
+
+    def __init__(self, folder: str, model_name: str, dimension: int, max_entries: int):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.max_entries = max_entries
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.folder = os.path.join(folder, slug)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._vectors: Optional[np.memmap] = None
+        self._touched: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _open(self) -> None:
+        if self._conn is not None:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        shape = f"{self.dimension}x{self.max_entries}"
+        vectors_path = os.path.join(self.folder, f"vectors_{shape}.f32")
+        mode = 'r+' if os.path.exists(vectors_path) else 'w+'
+        self._vectors = np.memmap(vectors_path, dtype='float32', mode=mode, shape=(self.max_entries, self.dimension))
+        conn = sqlite3.connect(os.path.join(self.folder, f"index_{shape}.sqlite"), timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, checksum INTEGER NOT NULL, last_used REAL NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+        self._conn = conn
+
+    def get_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        keys = [embedding_key(text, self.model_name) for text in texts]
+        found: Dict[int, np.ndarray] = {}
+        with self._lock:
+            self._open()
+            conn = self._conn
+            rows: Dict[str, Tuple[int, int]] = {}
+            unique = list(set(keys))
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                for key, slot, checksum in conn.execute(f'SELECT key, slot, checksum FROM entries WHERE key IN ({placeholders})', batch):
+                    rows[key] = (slot, checksum)
+            vectors: Dict[str, np.ndarray] = {}
+            for key, (slot, checksum) in rows.items():
+                vector = np.array(self._vectors[slot])
+                # Another process may be recycling this slot; its checksum
+                # no longer matches once the vector has been overwritten.
+                if zlib.crc32(vector.tobytes()) == checksum:
+                    vectors[key] = vector
+            for position, key in enumerate(keys):
+                vector = vectors.get(key)
+                if vector is not None:
+                    found[position] = vector.copy()
+            now = time.time()
+            self._touched.update((key, now) for key in vectors)
+            if len(self._touched) >= TOUCH_BATCH:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    self._flush_touched()
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        pending: Dict[str, np.ndarray] = {}
+        for text, vector in zip(texts, vectors):
+            pending[embedding_key(text, self.model_name)] = np.asarray(vector, dtype='float32')
+        with self._lock:
+            self._open()
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._flush_touched()
+                keys = list(pending)
+                existing = set()
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    placeholders = ','.join('?' * len(batch))
+                    existing.update(row[0] for row in conn.execute(f'SELECT key FROM entries WHERE key IN ({placeholders})', batch))
+                new_keys = [key for key in keys if key not in existing][:self.max_entries]
+                slots = self._allocate_slots(len(new_keys))
+                now = time.time()
+                for key, slot in zip(new_keys, slots):
+                    self._vectors[slot] = pending[key]
+                self._vectors.flush()
+                conn.executemany(
+                    'INSERT INTO entries (key, slot, checksum, last_used) VALUES (?, ?, ?, ?)',
+                    [(key, slot, zlib.crc32(pending[key].tobytes()), now) for key, slot in zip(new_keys, slots)],
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _flush_touched(self) -> None:
+        # Recency is batched: lookups only read, and the write lock is taken
+        # once per TOUCH_BATCH hits or alongside the next put_many.
+        if self._touched:
+            self._conn.executemany('UPDATE entries SET last_used = ? WHERE key = ?',
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def _allocate_slots(self, count: int) -> List[int]:
+        used = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        fresh = list(range(used, min(used + count, self.max_entries)))
+        shortfall = count - len(fresh)
+        if shortfall <= 0:
+            return fresh
+        rows = self._conn.execute('SELECT key, slot FROM entries ORDER BY last_used LIMIT ?', (shortfall,)).fetchall()
+        self._conn.executemany('DELETE FROM entries WHERE key = ?', [(row[0],) for row in rows])
+        self.evictions += len(rows)
+        return fresh + [row[1] for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'max_entries': self.max_entries,
+        }
@@ -0,0 +1,133 @@
+import os
+import json
+import socket
+import threading
+import http.client
+from urllib.parse import urlsplit
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from ..config import Config
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def open_connection(url: str, timeout: float) -> http.client.HTTPConnection:
+    parts = urlsplit(url)
+    if parts.scheme == 'unix':
+        return UnixHTTPConnection(parts.netloc + parts.path, timeout)
+    return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+
+class EmbeddingClient:
+    """Client for the embedding/search sidecar started with ``python -m server.sidecar``.
+
+    Each thread keeps its own keep-alive connection. Embeddings travel as raw
+    float32 bytes; everything else is JSON. Texts are sent ``batch_size`` per
+    request so a large document never has to fit in a single ``timeout``.
+    """
+
+    def __init__(self, url: str, timeout: float, batch_size: int):
+        self.url = url
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._info: Optional[Dict[str, Any]] = None
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[http.client.HTTPResponse, bytes]:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            conn = getattr(self._local, 'conn', None)
+            if conn is None:
+                conn = self._local.conn = open_connection(self.url, self.timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, socket.timeout, http.client.HTTPException):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"Embedding server error {response.status} on {path}: {data.decode('utf-8', 'replace')}")
+        return response, data
+
+    def _json(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None):
+        return json.loads(self._request(method, path, payload)[1])
+
+    def info(self) -> Dict[str, Any]:
+        if self._info is None:
+            self._info = self._json('GET', '/info')
+        return self._info
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        return [list(texts[start:start + self.batch_size]) for start in range(0, len(texts), self.batch_size)]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.info()['dimension']), dtype='float32')
+        encoded = []
+        for batch in self._batches(texts):
+            response, data = self._request('POST', '/encode', {'texts': batch})
+            dimension = int(response.getheader('X-Dimension'))
+            encoded.append(np.frombuffer(data, dtype='float32').reshape(-1, dimension))
+        return np.concatenate(encoded) if len(encoded) > 1 else encoded[0].copy()
+
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        lengths: List[int] = []
+        for batch in self._batches(texts):
+            lengths.extend(self._json('POST', '/tokenize', {'texts': batch})['lengths'])
+        return lengths
+
+    def vector_counts(self, owner_ids: List[str]) -> List[Optional[int]]:
+        return self._json('POST', '/counts', {'owner_ids': owner_ids})['counts']
+
+    def search(self, query: str, owner_ids: List[str], k: int, query_embedding: np.ndarray) -> List[Dict[str, Any]]:
+        payload = {
+            'query': query,
+            'owner_ids': owner_ids,
+            'k': k,
+            'embedding': np.asarray(query_embedding, dtype='float32').reshape(-1).tolist(),
+        }
+        return self._json('POST', '/search', payload)['results']
+
+    def stats(self) -> Dict[str, Any]:
+        return self._json('GET', '/stats')
+
+
+_clients: Dict[str, EmbeddingClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_embedding_client() -> Optional[EmbeddingClient]:
+    url = Config.EMBEDDING_SERVER_URL
+    if not url:
+        return None
+    with _clients_lock:
+        client = _clients.get(url)
+        if client is None:
+            client = _clients[url] = EmbeddingClient(
+                url, Config.EMBEDDING_SERVER_TIMEOUT, Config.EMBEDDING_BATCH_SIZE,
+            )
+        return client
+
+
+def _after_fork() -> None:
+    # Keep-alive sockets inherited from the parent would be shared with it.
+    global _clients_lock
+    _clients_lock = threading.Lock()
+    _clients.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork)
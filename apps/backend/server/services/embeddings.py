@@ -0,0 +1,186 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Any, Optional
+import numpy as np
+from ..config import Config
+from ..utils.startup import timed
+from .embedding_client import get_embedding_client
+
+
+class EmbeddingService:
+    """Coalesces encode calls from concurrent requests into shared batches.
+
+    Callers block on futures while a single background thread drains the
+    queue, so one model call serves many small requests. Large inputs are
+    split into batch-sized pieces so queries are not stuck behind a whole
+    upload. With
+    ``processes > 1`` batches are spread over a SentenceTransformer
+    multi-process pool to use every core on CPU-only hosts. The model comes
+    from ``model_loader`` on first use. The thread and pool belong to the
+    process that started them; a forked child (gunicorn ``--preload``)
+    starts its own on first use.
+    """
+
+    def __init__(self, model_loader: Callable[[], Any], batch_size: int, max_wait_ms: float, processes: int = 0,
+                 timeout: Optional[float] = None):
+        self.model_loader = model_loader
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.processes = processes
+        self.timeout = timeout
+        self._stats_lock = threading.Lock()
+        self._reset()
+        self.batches = 0
+        self.chunks = 0
+        self.encode_seconds = 0.0
+        self.last_chunks_per_second = 0.0
+
+    def _reset(self) -> None:
+        self._pool = None
+        self._queue: 'queue.Queue[tuple]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    def after_fork(self) -> None:
+        """Drop the parent's queue, thread and locks; registered with ``os.register_at_fork``."""
+        self._stats_lock = threading.Lock()
+        self._reset()
+
+    @property
+    def model(self):
+        return self.model_loader()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, embedding_dimension()), dtype='float32')
+        self._ensure_started()
+        futures = []
+        for start in range(0, len(texts), self.batch_size):
+            future: Future = Future()
+            self._queue.put((list(texts[start:start + self.batch_size]), future))
+            futures.append(future)
+        if len(futures) == 1:
+            return futures[0].result(timeout=self.timeout)
+        return np.concatenate([future.result(timeout=self.timeout) for future in futures])
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                # Load in the caller so a slow first load does not count against ``timeout``.
+                model = self.model_loader()
+                if self.processes > 1:
+                    self._pool = model.start_multi_process_pool(['cpu'] * self.processes)
+                self._thread = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._encode_pending(pending)
+
+    def _encode_pending(self, pending: List[tuple]) -> None:
+        texts = [text for item in pending for text in item[0]]
+        started = time.perf_counter()
+        try:
+            if self._pool is not None:
+                embeddings = self.model.encode_multi_process(texts, self._pool, batch_size=self.batch_size)
+            else:
+                embeddings = self.model.encode(texts, batch_size=self.batch_size)
+            embeddings = np.asarray(embeddings, dtype='float32')
+        except Exception as exc:
+            for _, future in pending:
+                future.set_exception(exc)
+            return
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.batches += 1
+            self.chunks += len(texts)
+            self.encode_seconds += elapsed
+            self.last_chunks_per_second = len(texts) / elapsed if elapsed > 0 else 0.0
+        offset = 0
+        for item_texts, future in pending:
+            future.set_result(embeddings[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'chunks': self.chunks,
+                'encode_seconds': round(self.encode_seconds, 3),
+                'chunks_per_second': self.chunks / self.encode_seconds if self.encode_seconds else 0.0,
+                'last_chunks_per_second': self.last_chunks_per_second,
+                'batch_size': self.batch_size,
+                'processes': self.processes,
+            }
+
+
+_embedding_model = None
+_model_lock = threading.Lock()
+
+
+def get_embedding_model():
+    global _embedding_model
+    if _embedding_model is None:
+        with _model_lock:
+            if _embedding_model is None:
+                with timed('embedding_model_load'):
+                    from sentence_transformers import SentenceTransformer
+                    _embedding_model = SentenceTransformer(Config.EMBEDDING_MODEL)
+    return _embedding_model
+
+
+def embedding_dimension() -> int:
+    client = get_embedding_client()
+    if client is not None:
+        return client.info()['dimension']
+    return get_embedding_model().get_sentence_embedding_dimension()
+
+
+def token_lengths(texts: List[str]) -> List[int]:
+    client = get_embedding_client()
+    if client is not None:
+        return client.token_lengths(texts)
+    encoded = get_embedding_model().tokenizer(texts, add_special_tokens=False)
+    return [len(ids) for ids in encoded['input_ids']]
+
+
+def max_chunk_tokens() -> int:
+    client = get_embedding_client()
+    max_seq_length = client.info()['max_seq_length'] if client is not None else get_embedding_model().max_seq_length
+    return min(Config.CHUNK_TOKENS, max_seq_length - 2)
+
+
+embedding_service = EmbeddingService(
+    get_embedding_model,
+    Config.EMBEDDING_BATCH_SIZE,
+    Config.EMBEDDING_BATCH_WAIT_MS,
+    Config.EMBEDDING_PROCESSES,
+    Config.EMBEDDING_TIMEOUT or None,
+)
+
+
+def _after_fork() -> None:
+    global _model_lock
+    _model_lock = threading.Lock()
+    embedding_service.after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork)
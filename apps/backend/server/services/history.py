@@ -1,30 +1,107 @@
 import os
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from ..config import Config
+from ..utils.locks import FileLocks
+from .metrics import stage_timer
+
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+_user_locks = FileLocks(lambda: Config.HISTORY_FOLDER)
+_compacted_sizes: Dict[str, int] = {}
 
 
 def get_history_path(user_id: str) -> str:
+    return os.path.join(Config.HISTORY_FOLDER, f"{user_id}.jsonl")
+
+
+def _legacy_history_path(user_id: str) -> str:
     return os.path.join(Config.HISTORY_FOLDER, f"{user_id}.json")
 
 
-def read_user_history(user_id: str) -> List[Dict[str, Any]]:
-    path = get_history_path(user_id)
-    if os.path.exists(path):
+def _migrate_legacy_history(user_id: str) -> None:
+    legacy_path = _legacy_history_path(user_id)
+    if not os.path.exists(legacy_path):
+        return
+    try:
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except Exception:
+        entries = []
+    _write_entries(get_history_path(user_id), entries[-Config.HISTORY_LIMIT:])
+    os.remove(legacy_path)
+
+
+def _write_entries(path: str, entries: List[Dict[str, Any]]) -> int:
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        size = f.tell()
+    os.replace(temp_path, path)
+    return size
+
+
+def _tail_lines(path: str, count: int) -> List[bytes]:
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(TAIL_BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.split(b'\n')
+    if position > 0:
+        lines = lines[1:]
+    return [line for line in lines if line.strip()][-count:]
+
+
+def _parse_lines(lines: List[bytes]) -> List[Dict[str, Any]]:
+    entries = []
+    for line in lines:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return []
-    return []
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
+
+
+def read_user_history(user_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    return read_user_history_page(user_id, limit, offset)[0]
+
+
+def read_user_history_page(user_id: str, limit: Optional[int] = None, offset: int = 0) -> Tuple[List[Dict[str, Any]], bool]:
+    if os.path.exists(_legacy_history_path(user_id)):
+        with _user_locks(user_id):
+            _migrate_legacy_history(user_id)
+    path = get_history_path(user_id)
+    cap = Config.HISTORY_LIMIT
+    offset = max(0, min(offset, cap))
+    limit = cap - offset if limit is None else max(0, min(limit, cap - offset))
+    if limit == 0 or not os.path.exists(path):
+        return [], False
+    lines = _tail_lines(path, offset + limit + 1)
+    older = lines[:max(0, len(lines) - offset)]
+    has_more = len(older) > limit and offset + limit < cap
+    return _parse_lines(older[-limit:]), has_more
 
 
 def append_user_history(user_id: str, entry: Dict[str, Any]) -> None:
-    history = read_user_history(user_id)
-    history.append(entry)
-    if len(history) > 500:
-        history = history[-500:]
-    with open(get_history_path(user_id), 'w', encoding='utf-8') as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+    path = get_history_path(user_id)
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    with stage_timer('history_write'), _user_locks(user_id):
+        _migrate_legacy_history(user_id)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            size = f.tell()
+        baseline = _compacted_sizes.setdefault(user_id, size)
+        if size > max(2 * baseline, Config.HISTORY_COMPACT_MIN_BYTES):
+            _compacted_sizes[user_id] = compact_user_history(user_id)
 
 
+def compact_user_history(user_id: str) -> int:
+    path = get_history_path(user_id)
+    return _write_entries(path, _parse_lines(_tail_lines(path, Config.HISTORY_LIMIT)))
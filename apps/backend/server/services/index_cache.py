@@ -0,0 +1,105 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any
+from ..config import Config
+from .index_factory import index_kind, read_index_file
+from .metrics import stage_timer
+
+
+MMAP_BYTES_PER_VECTOR = 16
+
+
+class IndexCache:
+    """LRU cache of loaded FAISS indexes keyed by user_id.
+
+    Entries are bounded by an approximate byte budget and revalidated against
+    the index file's inode, size and mtime, so writes made by another worker
+    process are picked up without explicit invalidation. With ``mmap`` the vectors of flat
+    indexes are memory-mapped read-only and shared through the OS page cache,
+    so only their id maps count against the budget; other index types are
+    charged their file size.
+    """
+
+    def __init__(self, max_bytes: int, mmap: bool = False):
+        self.max_bytes = max_bytes
+        self.mmap = mmap
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str, index_path: str):
+        try:
+            st = os.stat(index_path)
+        except FileNotFoundError:
+            self.invalidate(user_id)
+            return None
+        # os.replace by another process can keep the mtime on coarse
+        # timestamps; the new file still has its own inode.
+        stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry['stamp'] == stamp:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry['index']
+            self.misses += 1
+
+        with stage_timer('index_load'):
+            index = read_index_file(index_path, mmap=self.mmap)
+        if self.mmap and index_kind(index) == 'flat':
+            size = index.ntotal * MMAP_BYTES_PER_VECTOR
+        else:
+            # IVF and HNSW indexes are read onto the heap even with mmap.
+            size = st.st_size
+
+        with self._lock:
+            self._discard(user_id)
+            if size <= self.max_bytes:
+                self._entries[user_id] = {'index': index, 'stamp': stamp, 'size': size}
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    oldest = next(iter(self._entries))
+                    self._discard(oldest)
+                    self.evictions += 1
+        return index
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            if self._discard(user_id):
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'mmap': self.mmap,
+            }
+
+    def _discard(self, user_id: str) -> bool:
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return False
+        self._bytes -= entry['size']
+        return True
+
+
+index_cache = IndexCache(Config.INDEX_CACHE_MAX_BYTES, bool(Config.INDEX_MMAP))
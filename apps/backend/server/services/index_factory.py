@@ -0,0 +1,129 @@
+import os
+import math
+from typing import Tuple
+import faiss
+import numpy as np
+from ..config import Config
+
+
+INDEX_KINDS = ('flat', 'ivf', 'hnsw', 'ivfpq')
+MIN_POINTS_PER_CENTROID = 39
+MAX_POINTS_PER_CENTROID = 256
+
+
+def choose_index_kind(ntotal: int) -> str:
+    if ntotal < Config.ANN_MIN_VECTORS:
+        return 'flat'
+    kind = Config.VECTOR_INDEX_TYPE
+    if kind == 'auto':
+        return 'ivfpq' if ntotal >= Config.ANN_PQ_MIN_VECTORS else 'ivf'
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Unknown VECTOR_INDEX_TYPE {kind!r}")
+    return kind
+
+
+def index_kind(index) -> str:
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+    if isinstance(index, faiss.IndexHNSW):
+        return 'hnsw'
+    if isinstance(index, faiss.IndexIVFPQ):
+        return 'ivfpq'
+    if isinstance(index, faiss.IndexIVF):
+        return 'ivf'
+    return 'flat'
+
+
+def supports_remove(index) -> bool:
+    return index_kind(index) != 'hnsw'
+
+
+def needs_rebuild(index) -> bool:
+    kind = index_kind(index)
+    if kind != choose_index_kind(index.ntotal):
+        return True
+    return kind in ('ivf', 'ivfpq') and index.nlist * 2 < _nlist(index.ntotal)
+
+
+def _nlist(ntotal: int) -> int:
+    nlist = Config.IVF_NLIST or int(4 * math.sqrt(ntotal))
+    return max(1, min(nlist, ntotal // MIN_POINTS_PER_CENTROID))
+
+
+def _pq_subquantizers(dimension: int) -> int:
+    m = min(Config.PQ_SUBQUANTIZERS, dimension)
+    while dimension % m:
+        m -= 1
+    return m
+
+
+def _empty_index(kind: str, dimension: int, ntotal: int):
+    if kind == 'flat':
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+    if kind == 'hnsw':
+        hnsw = faiss.IndexHNSWFlat(dimension, Config.HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = Config.HNSW_EF_CONSTRUCTION
+        return faiss.IndexIDMap2(hnsw)
+    quantizer = faiss.IndexFlatIP(dimension)
+    if kind == 'ivf':
+        index = faiss.IndexIVFFlat(quantizer, dimension, _nlist(ntotal), faiss.METRIC_INNER_PRODUCT)
+    else:
+        index = faiss.IndexIVFPQ(quantizer, dimension, _nlist(ntotal), _pq_subquantizers(dimension), 8,
+                                 faiss.METRIC_INNER_PRODUCT)
+    index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    return index
+
+
+def build_index(kind: str, vectors: np.ndarray, ids: np.ndarray):
+    index = _empty_index(kind, vectors.shape[1], len(vectors))
+    if not index.is_trained:
+        sample = vectors
+        limit = index.nlist * MAX_POINTS_PER_CENTROID
+        if kind == 'ivfpq':
+            limit = max(limit, 256 * MAX_POINTS_PER_CENTROID)
+        if len(sample) > limit:
+            sample = vectors[np.random.default_rng(0).choice(len(vectors), limit, replace=False)]
+        index.train(np.ascontiguousarray(sample))
+    if len(vectors):
+        index.add_with_ids(np.ascontiguousarray(vectors), np.asarray(ids, dtype='int64'))
+    return configure_index(index)
+
+
+def configure_index(index):
+    kind = index_kind(index)
+    if kind in ('ivf', 'ivfpq'):
+        index.nprobe = Config.IVF_NPROBE
+    elif kind == 'hnsw':
+        faiss.downcast_index(index.index).hnsw.efSearch = Config.HNSW_EF_SEARCH
+    return index
+
+
+def extract_vectors(index) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(index, faiss.IndexIDMap):
+        ids = faiss.vector_to_array(index.id_map).astype('int64')
+        return ids, index.index.reconstruct_n(0, index.ntotal)
+    if isinstance(index, faiss.IndexIVF):
+        if index.direct_map.type != faiss.DirectMap.Hashtable:
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        lists = index.invlists
+        ids = np.concatenate(
+            [faiss.rev_swig_ptr(lists.get_ids(nlist_), lists.list_size(nlist_)).copy() for nlist_ in range(index.nlist)]
+            + [np.zeros(0, dtype='int64')]
+        ).astype('int64')
+        if not len(ids):
+            return ids, np.zeros((0, index.d), dtype='float32')
+        return ids, index.reconstruct_batch(ids)
+    ids = np.arange(index.ntotal, dtype='int64')
+    return ids, index.reconstruct_n(0, index.ntotal)
+
+
+def read_index_file(path: str, mmap: bool = False):
+    if mmap:
+        return configure_index(faiss.read_index(path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY))
+    return configure_index(faiss.read_index(path))
+
+
+def write_index_file(index, path: str) -> None:
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    faiss.write_index(index, temp_path)
+    os.replace(temp_path, path)
@@ -0,0 +1,93 @@
+import time
+from datetime import datetime
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+import numpy as np
+from ..config import Config
+from ..utils.files import iter_text_from_file
+from ..utils.chunking import iter_text_chunks, char_lengths
+from .embeddings import token_lengths, max_chunk_tokens
+from .vectors import add_user_document_batches, embed_chunks
+from .content_store import artifact_signature, finish_artifacts, get_artifacts, put_artifacts
+from .metrics import STAGE_SECONDS, TimedIterator
+
+Batch = Tuple[List[Dict[str, Any]], np.ndarray]
+
+
+def _extract_batches(file_path: str, filename: str, max_size: int, overlap: int,
+                     length_fn: Callable[[List[str]], List[int]], on_stage: Optional[Callable[[str], None]],
+                     content_hash: Optional[str], signature: str) -> Iterator[Batch]:
+    pages = TimedIterator(iter_text_from_file(file_path, filename), 'extraction')
+    chunks = iter_text_chunks(pages, max_size, overlap, length_fn)
+    pulling = 0.0
+    seq = 0
+    while True:
+        started = time.perf_counter()
+        window = [
+            {'text': chunk['text'], 'page': chunk['page'], 'start': chunk['start'], 'end': chunk['end']}
+            for chunk in islice(chunks, Config.INGEST_WINDOW_CHUNKS)
+        ]
+        pulling += time.perf_counter() - started
+        if not window:
+            break
+        if seq == 0 and on_stage:
+            on_stage('embedding')
+        embeddings = embed_chunks([chunk['text'] for chunk in window])
+        if content_hash:
+            put_artifacts(content_hash, signature, seq, window, embeddings)
+        seq += 1
+        yield window, embeddings
+    STAGE_SECONDS.observe(pulling - pages.elapsed, stage='chunking')
+    if content_hash and seq:
+        finish_artifacts(content_hash, signature, seq)
+
+
+def _with_metadata(batches: Iterable[Batch], file_id: str, filename: str, upload_time: str) -> Iterator[Batch]:
+    chunk_index = 0
+    for chunks, embeddings in batches:
+        metadata = []
+        for chunk in chunks:
+            metadata.append({
+                'text': chunk['text'],
+                'metadata': {
+                    'file_id': file_id,
+                    'filename': filename,
+                    'chunk_index': chunk_index,
+                    'page': chunk['page'],
+                    'start': chunk['start'],
+                    'end': chunk['end'],
+                    'upload_time': upload_time,
+                },
+            })
+            chunk_index += 1
+        yield metadata, embeddings
+
+
+def ingest_file(user_id: str, file_id: str, filename: str, file_path: str,
+                on_stage: Optional[Callable[[str], None]] = None,
+                content_hash: Optional[str] = None) -> Dict[str, Any]:
+    if Config.CHUNK_SIZE_UNIT == 'tokens':
+        max_size, overlap, length_fn = max_chunk_tokens(), Config.CHUNK_OVERLAP_TOKENS, token_lengths
+    else:
+        max_size, overlap, length_fn = Config.CHUNK_SIZE, Config.CHUNK_OVERLAP, char_lengths
+    signature = artifact_signature(max_size, overlap)
+    artifacts = get_artifacts(content_hash, signature) if content_hash else None
+    if artifacts is not None:
+        if on_stage:
+            on_stage('linking')
+        batches = artifacts
+    else:
+        if on_stage:
+            on_stage('extracting')
+        # Extraction, chunking, embedding and indexing run one window of
+        # INGEST_WINDOW_CHUNKS chunks at a time, so memory does not grow with the file.
+        batches = _extract_batches(file_path, filename, max_size, overlap, length_fn, on_stage, content_hash, signature)
+    upload_time = datetime.now().isoformat()
+    doc_info = {
+        'file_id': file_id,
+        'filename': filename,
+        'file_path': file_path,
+        'upload_time': upload_time,
+    }
+    add_user_document_batches(user_id, doc_info, _with_metadata(batches, file_id, filename, upload_time))
+    return doc_info
@@ -0,0 +1,293 @@
+import os
+import uuid
+import fcntl
+import sqlite3
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from ..config import Config
+from .content_store import release_upload
+from .chunked_uploads import abort_session, finish_upload
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+_worker_token: Optional[str] = None
+_worker_fd: Optional[int] = None
+_resumed_pid: Optional[int] = None
+_schema_ready = False
+
+
+def _connect() -> sqlite3.Connection:
+    global _schema_ready
+    conn = sqlite3.connect(Config.JOBS_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _schema_ready:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+            CREATE TABLE IF NOT EXISTS job_files (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                file_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                chunk_count INTEGER,
+                error TEXT,
+                PRIMARY KEY (job_id, position)
+            );
+        """)
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+        if 'owner_id' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN owner_id TEXT')
+        if 'worker' not in columns:
+            conn.execute('ALTER TABLE jobs ADD COLUMN worker TEXT')
+        file_columns = {row['name'] for row in conn.execute('PRAGMA table_info(job_files)')}
+        if 'content_hash' not in file_columns:
+            conn.execute('ALTER TABLE job_files ADD COLUMN content_hash TEXT')
+        if 'upload_id' not in file_columns:
+            conn.execute('ALTER TABLE job_files ADD COLUMN upload_id TEXT')
+        _schema_ready = True
+    return conn
+
+
+def _worker_path(token: str) -> str:
+    return os.path.join(Config.JOB_WORKERS_FOLDER, f"{token}.lock")
+
+
+def _executor_instance() -> ThreadPoolExecutor:
+    global _executor, _executor_pid, _worker_token, _worker_fd
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # Jobs claimed by this process record its token; the flock on the
+            # token's file is held until the process exits, however it exits.
+            os.makedirs(Config.JOB_WORKERS_FOLDER, exist_ok=True)
+            token = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+            fd = os.open(_worker_path(token), os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            _worker_token, _worker_fd = token, fd
+            _executor = ThreadPoolExecutor(max_workers=Config.INGEST_WORKERS, thread_name_prefix='ingest')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _worker_alive(token: Optional[str]) -> bool:
+    if token is None:
+        return False
+    if token == _worker_token and _executor_pid == os.getpid():
+        return True
+    try:
+        fd = os.open(_worker_path(token), os.O_RDWR)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+    try:
+        os.remove(_worker_path(token))
+    except FileNotFoundError:
+        pass
+    return False
+
+
+def _after_fork() -> None:
+    # The parent's ingest threads do not exist in a forked child, and its
+    # worker lock must not outlive the parent through an inherited descriptor.
+    global _executor, _executor_lock, _worker_token, _worker_fd
+    if _worker_fd is not None:
+        os.close(_worker_fd)
+    _executor = None
+    _executor_lock = threading.Lock()
+    _worker_token = _worker_fd = None
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def create_ingest_job(user_id: str, files: List[Dict[str, str]], owner_id: Optional[str] = None,
+                      job_id: Optional[str] = None) -> str:
+    job_id = job_id or str(uuid.uuid4())
+    now = datetime.now().isoformat()
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                'INSERT INTO jobs (job_id, user_id, owner_id, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, user_id, owner_id or user_id, 'queued', now, now),
+            )
+            conn.executemany(
+                'INSERT INTO job_files (job_id, position, file_id, filename, file_path, content_hash, upload_id, status) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(job_id, i, f['file_id'], f['filename'], f['file_path'], f.get('content_hash'), f.get('upload_id'),
+                  'queued')
+                 for i, f in enumerate(files)],
+            )
+    finally:
+        conn.close()
+    _executor_instance().submit(_run_job, job_id)
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        job = conn.execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if job is None:
+            return None
+        files = conn.execute('SELECT * FROM job_files WHERE job_id = ? ORDER BY position', (job_id,)).fetchall()
+    finally:
+        conn.close()
+    file_list = [
+        {
+            'file_id': row['file_id'],
+            'filename': row['filename'],
+            'status': row['status'],
+            'chunk_count': row['chunk_count'],
+            'error': row['error'],
+        }
+        for row in files
+    ]
+    finished = sum(1 for f in file_list if f['status'] in ('done', 'failed'))
+    return {
+        'job_id': job['job_id'],
+        'user_id': job['user_id'],
+        'status': job['status'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+        'progress': {'completed': finished, 'total': len(file_list)},
+        'files': file_list,
+    }
+
+
+def resume_pending_jobs() -> int:
+    """Queue every waiting job, including 'running' jobs whose process has died."""
+    conn = _connect()
+    try:
+        running = conn.execute("SELECT job_id, worker FROM jobs WHERE status = 'running'").fetchall()
+        for row in running:
+            if _worker_alive(row['worker']):
+                continue
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', worker = NULL, updated_at = ? "
+                    "WHERE job_id = ? AND status = 'running' AND worker IS ?",
+                    (datetime.now().isoformat(), row['job_id'], row['worker']),
+                )
+        job_ids = [row['job_id'] for row in conn.execute("SELECT job_id FROM jobs WHERE status = 'queued'")]
+    finally:
+        conn.close()
+    for job_id in job_ids:
+        _executor_instance().submit(_run_job, job_id)
+    return len(job_ids)
+
+
+def resume_pending_jobs_once() -> None:
+    """Run ``resume_pending_jobs`` once in each process, on its first request.
+
+    Resuming from ``create_app`` would start the ingest threads in a
+    gunicorn ``--preload`` master, where the forked workers cannot use them.
+    """
+    global _resumed_pid
+    with _executor_lock:
+        if _resumed_pid == os.getpid():
+            return
+        _resumed_pid = os.getpid()
+    resume_pending_jobs()
+
+
+def _set_job(conn: sqlite3.Connection, job_id: str, status: str, error: Optional[str] = None) -> None:
+    with conn:
+        conn.execute(
+            'UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?',
+            (status, error, datetime.now().isoformat(), job_id),
+        )
+
+
+def _set_file(conn: sqlite3.Connection, job_id: str, position: int, status: str,
+              chunk_count: Optional[int] = None, error: Optional[str] = None) -> None:
+    with conn:
+        conn.execute(
+            'UPDATE job_files SET status = ?, chunk_count = ?, error = ? WHERE job_id = ? AND position = ?',
+            (status, chunk_count, error, job_id, position),
+        )
+        conn.execute('UPDATE jobs SET updated_at = ? WHERE job_id = ?', (datetime.now().isoformat(), job_id))
+
+
+def _run_job(job_id: str) -> None:
+    from .ingestion import ingest_file
+    from .vectors import get_meta_store
+
+    conn = _connect()
+    try:
+        with conn:
+            claimed = conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, updated_at = ? WHERE job_id = ? AND status = 'queued'",
+                (_worker_token, datetime.now().isoformat(), job_id),
+            ).rowcount
+        if not claimed:
+            return
+        job = conn.execute('SELECT user_id, owner_id FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        owner_id = job['owner_id'] or job['user_id']
+        files = conn.execute('SELECT * FROM job_files WHERE job_id = ? ORDER BY position', (job_id,)).fetchall()
+        failures = 0
+        for row in files:
+            position = row['position']
+            if row['status'] == 'failed':
+                failures += 1
+                continue
+            if row['status'] == 'done':
+                continue
+            if row['status'] != 'queued':
+                # Resumed after a crash mid-file: the document may already have been added.
+                document = get_meta_store(owner_id).get_document(row['file_id'])
+                if document is not None:
+                    _set_file(conn, job_id, position, 'done', chunk_count=document['chunk_count'])
+                    continue
+            file_path, content_hash, upload_id = row['file_path'], row['content_hash'], row['upload_id']
+            try:
+                if upload_id:
+                    _set_file(conn, job_id, position, 'assembling')
+                    file_path, content_hash = finish_upload(upload_id)
+                    upload_id = None
+                    with conn:
+                        conn.execute(
+                            'UPDATE job_files SET file_path = ?, content_hash = ?, upload_id = NULL '
+                            'WHERE job_id = ? AND position = ?',
+                            (file_path, content_hash, job_id, position),
+                        )
+                    abort_session(row['upload_id'])
+                doc_info = ingest_file(
+                    owner_id, row['file_id'], row['filename'], file_path, content_hash=content_hash,
+                    on_stage=lambda stage, position=position: _set_file(conn, job_id, position, stage),
+                )
+            except Exception as exc:
+                failures += 1
+                if not upload_id:
+                    # No document refers to the upload, so drop the reference taken when it was saved.
+                    release_upload(file_path)
+                _set_file(conn, job_id, position, 'failed', error=str(exc))
+                continue
+            _set_file(conn, job_id, position, 'done', chunk_count=doc_info['chunk_count'])
+        if failures == len(files):
+            _set_job(conn, job_id, 'failed', 'All files failed to process')
+        else:
+            _set_job(conn, job_id, 'completed')
+    except Exception as exc:
+        _set_job(conn, job_id, 'failed', str(exc))
+    finally:
+        conn.close()
@@ -0,0 +1,306 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from contextlib import closing
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+
+KEYWORD_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(text, content='chunks', content_rowid='id')",
+    """CREATE TABLE IF NOT EXISTS keyword_terms (
+    term TEXT PRIMARY KEY,
+    docs INTEGER NOT NULL
+) WITHOUT ROWID""",
+    """CREATE TRIGGER IF NOT EXISTS chunks_fts_insert AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts (rowid, text) VALUES (new.id, new.text);
+END""",
+    """CREATE TRIGGER IF NOT EXISTS chunks_fts_delete AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts (chunks_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END""",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    position INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_id TEXT NOT NULL UNIQUE,
+    filename TEXT NOT NULL,
+    file_path TEXT,
+    upload_time TEXT,
+    chunk_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    file_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    page INTEGER,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    upload_time TEXT
+);
+CREATE INDEX IF NOT EXISTS chunks_file_id ON chunks (file_id);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+""" + ''.join(f"{statement};\n" for statement in KEYWORD_STATEMENTS)
+
+DOCUMENT_FIELDS = ('file_id', 'filename', 'file_path', 'upload_time', 'chunk_count')
+KEYWORD_TERM = re.compile(r'[^\W_]+')
+MAX_KEYWORD_TERMS = 32
+MAX_READERS_PER_THREAD = 16
+
+_readers = threading.local()
+
+
+def _term_counts(texts: Iterable[str]) -> Counter:
+    counts: Counter = Counter()
+    for text in texts:
+        counts.update(set(KEYWORD_TERM.findall(text.lower())))
+    return counts
+
+
+def _add_term_counts(conn: sqlite3.Connection, texts: Iterable[str]) -> None:
+    conn.executemany(
+        'INSERT INTO keyword_terms (term, docs) VALUES (?, ?) '
+        'ON CONFLICT(term) DO UPDATE SET docs = docs + excluded.docs',
+        _term_counts(texts).items(),
+    )
+
+
+def _remove_chunks(conn: sqlite3.Connection, file_id: str) -> None:
+    texts = [row['text'] for row in conn.execute('SELECT text FROM chunks WHERE file_id = ?', (file_id,))]
+    conn.executemany(
+        'UPDATE keyword_terms SET docs = docs - ? WHERE term = ?',
+        [(count, term) for term, count in _term_counts(texts).items()],
+    )
+    conn.execute('DELETE FROM keyword_terms WHERE docs <= 0')
+    conn.execute('DELETE FROM chunks WHERE file_id = ?', (file_id,))
+
+
+class MetaStore:
+    """Per-user SQLite store for chunk text/metadata and the document list.
+
+    Chunk rows are keyed by the same ids as the user's FAISS index, so a
+    search only reads the top-k rows it needs. An FTS5 table over the chunk
+    text, kept in sync by triggers, serves BM25 keyword search; per-term
+    document counts let a query skip terms too common to be worth scoring.
+    """
+
+    _keyword_ready = set()
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        created = not os.path.exists(self.path)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if created:
+            conn.executescript(SCHEMA)
+            MetaStore._keyword_ready.add(self.path)
+        elif self.path not in MetaStore._keyword_ready:
+            self._ensure_keyword_index(conn)
+        return conn
+
+    def _ensure_keyword_index(self, conn: sqlite3.Connection) -> None:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'keyword_terms'").fetchone()
+        if not exists:
+            conn.execute('BEGIN IMMEDIATE')
+            with conn:
+                # Another process may have upgraded the store while we waited for the lock.
+                upgraded = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'keyword_terms'").fetchone()
+                if not upgraded:
+                    for statement in KEYWORD_STATEMENTS:
+                        conn.execute(statement)
+                    conn.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')")
+                    _add_term_counts(conn, (row['text'] for row in conn.execute('SELECT text FROM chunks')))
+        MetaStore._keyword_ready.add(self.path)
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+        readers: 'OrderedDict[str, Tuple[sqlite3.Connection, int]]' = getattr(_readers, 'connections', None)
+        if readers is None:
+            readers = _readers.connections = OrderedDict()
+        cached = readers.pop(self.path, None)
+        if cached is not None and cached[1] == inode:
+            conn = cached[0]
+        else:
+            if cached is not None:
+                cached[0].close()
+            conn = self._connect()
+        readers[self.path] = (conn, inode)
+        while len(readers) > MAX_READERS_PER_THREAD:
+            readers.popitem(last=False)[1][0].close()
+        return conn
+
+    def allocate_ids(self, count: int) -> int:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT value FROM counters WHERE name = 'next_id'").fetchone()
+            first_id = row['value'] if row else 0
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES ('next_id', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+                (first_id + count,),
+            )
+        return first_id
+
+    def add_chunks(self, chunks: List[Dict[str, Any]], ids: Iterable[int]) -> None:
+        # Chunks stay out of get_chunks results until add_document commits their document row.
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                'INSERT INTO chunks (id, file_id, chunk_index, text, page, start_offset, end_offset, upload_time) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        int(chunk_id),
+                        chunk['metadata']['file_id'],
+                        chunk['metadata']['chunk_index'],
+                        chunk['text'],
+                        chunk['metadata'].get('page'),
+                        chunk['metadata'].get('start'),
+                        chunk['metadata'].get('end'),
+                        chunk['metadata'].get('upload_time'),
+                    )
+                    for chunk_id, chunk in zip(ids, chunks)
+                ],
+            )
+            _add_term_counts(conn, (chunk['text'] for chunk in chunks))
+
+    def add_document(self, document: Dict[str, Any]) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT INTO documents (file_id, filename, file_path, upload_time, chunk_count) VALUES (?, ?, ?, ?, ?)',
+                tuple(document.get(field) for field in DOCUMENT_FIELDS),
+            )
+
+    def list_documents(self) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT {', '.join(DOCUMENT_FIELDS)} FROM documents ORDER BY position").fetchall()
+        return [dict(row) for row in rows]
+
+    def get_document(self, file_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT {', '.join(DOCUMENT_FIELDS)} FROM documents WHERE file_id = ?", (file_id,)).fetchone()
+        return dict(row) if row else None
+
+    def chunk_ids_for_file(self, file_id: str) -> List[int]:
+        with closing(self._connect()) as conn:
+            return [row['id'] for row in conn.execute('SELECT id FROM chunks WHERE file_id = ?', (file_id,))]
+
+    def chunk_ids(self) -> List[int]:
+        with closing(self._connect()) as conn:
+            return [row['id'] for row in conn.execute('SELECT id FROM chunks')]
+
+    def remove_chunks(self, file_id: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            _remove_chunks(conn, file_id)
+
+    def remove_document(self, file_id: str) -> int:
+        with closing(self._connect()) as conn, conn:
+            _remove_chunks(conn, file_id)
+            conn.execute('DELETE FROM documents WHERE file_id = ?', (file_id,))
+            return conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def get_chunks(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        ids = [int(chunk_id) for chunk_id in ids]
+        if not ids:
+            return {}
+        conn = self._reader()
+        if conn is None:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        rows = conn.execute(
+            'SELECT c.id, c.file_id, c.chunk_index, c.text, c.page, c.start_offset, c.end_offset, c.upload_time, '
+            f'd.filename FROM chunks c JOIN documents d ON d.file_id = c.file_id WHERE c.id IN ({placeholders})',
+            ids,
+        ).fetchall()
+        return {
+            row['id']: {
+                'id': row['id'],
+                'text': row['text'],
+                'metadata': {
+                    'file_id': row['file_id'],
+                    'filename': row['filename'],
+                    'chunk_index': row['chunk_index'],
+                    'page': row['page'],
+                    'start': row['start_offset'],
+                    'end': row['end_offset'],
+                    'upload_time': row['upload_time'],
+                },
+            }
+            for row in rows
+        }
+
+    def keyword_search(self, query: str, k: int = 20, max_term_docs: int = 500) -> List[Tuple[int, float]]:
+        terms = list(dict.fromkeys(KEYWORD_TERM.findall(query.lower())))[:MAX_KEYWORD_TERMS]
+        if not terms:
+            return []
+        conn = self._reader()
+        if conn is None:
+            return []
+        placeholders = ','.join('?' * len(terms))
+        rows = conn.execute(
+            f'SELECT term FROM keyword_terms WHERE term IN ({placeholders}) AND docs <= ?',
+            terms + [max_term_docs],
+        ).fetchall()
+        if not rows:
+            return []
+        match = ' OR '.join(f'"{row["term"]}"' for row in rows)
+        rows = conn.execute(
+            'SELECT rowid, bm25(chunks_fts) AS rank FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?',
+            (match, k),
+        ).fetchall()
+        return [(row['rowid'], -row['rank']) for row in rows]
+
+    def chunk_count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM chunks').fetchone()[0]
+
+    def import_legacy_json(self, meta_path: str) -> None:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta_json = json.load(f)
+        metadata = meta_json.get('metadata', [])
+        by_file: Dict[str, List[tuple]] = {}
+        for position, meta in enumerate(metadata):
+            by_file.setdefault(meta['metadata']['file_id'], []).append((meta.get('id', position), meta))
+        with closing(self._connect()) as conn, conn:
+            for document in meta_json.get('documents', []):
+                conn.execute(
+                    'INSERT OR IGNORE INTO documents (file_id, filename, file_path, upload_time, chunk_count) VALUES (?, ?, ?, ?, ?)',
+                    tuple(document.get(field) for field in DOCUMENT_FIELDS),
+                )
+            for file_id, entries in by_file.items():
+                conn.executemany(
+                    'INSERT OR IGNORE INTO chunks (id, file_id, chunk_index, text, page, start_offset, end_offset, upload_time) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (
+                            int(chunk_id),
+                            file_id,
+                            meta['metadata'].get('chunk_index', 0),
+                            meta.get('text', ''),
+                            meta['metadata'].get('page'),
+                            meta['metadata'].get('start'),
+                            meta['metadata'].get('end'),
+                            meta['metadata'].get('upload_time'),
+                        )
+                        for chunk_id, meta in entries
+                    ],
+                )
+                _add_term_counts(conn, (meta.get('text', '') for _, meta in entries))
+            next_id = meta_json.get('next_id', len(metadata))
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES ('next_id', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)",
+                (next_id,),
+            )
@@ -0,0 +1,149 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in key)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+class Counter:
+    """Monotonic counter with optional labels, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        lines.extend(f'{self.name}{_format_labels(key)} {_format_value(value)}' for key, value in values)
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels, in seconds by default."""
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            series['counts'][position] += 1
+            series['sum'] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(data['counts']), data['sum']) for key, data in self._series.items())
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                bucket_key = key + (('le', _format_value(bound)),)
+                lines.append(f'{self.name}_bucket{_format_labels(bucket_key)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {cumulative}')
+        return lines
+
+
+def render_samples(name: str, kind: str, documentation: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{_format_labels(_label_key(labels))} {_format_value(value)}' for labels, value in samples)
+    return lines
+
+
+STAGE_SECONDS = Histogram('docbot_stage_seconds', 'Time spent in each processing stage.')
+HTTP_REQUEST_SECONDS = Histogram('docbot_http_request_seconds', 'HTTP request latency by endpoint.')
+HTTP_REQUESTS = Counter('docbot_http_requests_total', 'HTTP requests by endpoint, method and status.')
+DOCUMENTS_INDEXED = Counter('docbot_documents_indexed_total', 'Documents added to a vector index.')
+CHUNKS_INDEXED = Counter('docbot_chunks_indexed_total', 'Chunks added to a vector index.')
+SLOW_REQUEST_PROFILES = Counter('docbot_slow_request_profiles_total', 'cProfile dumps written for slow requests.')
+
+REGISTRY = (
+    STAGE_SECONDS, HTTP_REQUEST_SECONDS, HTTP_REQUESTS, DOCUMENTS_INDEXED, CHUNKS_INDEXED, SLOW_REQUEST_PROFILES,
+)
+
+
+def stage_timer(stage: str):
+    return STAGE_SECONDS.time(stage=stage)
+
+
+class TimedIterator:
+    """Wraps an iterator and records the time spent producing its items under ``stage``.
+
+    Used where stages are interleaved, e.g. chunking pulls pages from
+    extraction, so the consumer can subtract ``elapsed`` from its own time.
+    """
+
+    def __init__(self, iterable: Iterable, stage: str):
+        self._iterator = iter(iterable)
+        self.stage = stage
+        self.elapsed = 0.0
+        self._done = False
+
+    def __iter__(self) -> 'TimedIterator':
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            if not self._done:
+                self._done = True
+                self.elapsed += time.perf_counter() - started
+                STAGE_SECONDS.observe(self.elapsed, stage=self.stage)
+            raise
+        self.elapsed += time.perf_counter() - started
+        return item
+
+
+def render_registry() -> List[str]:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return lines
@@ -0,0 +1,110 @@
+import os
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional
+from ..config import Config
+
+
+USER_CACHE_SIZE = 10000
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized_path: Optional[str] = None
+_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized_path
+    path = Config.USERS_DB
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'path', None) != path:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        _local.conn = conn
+        _local.path = path
+    if _initialized_path != path:
+        with _init_lock:
+            if _initialized_path != path:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS users (
+                        user_id TEXT PRIMARY KEY,
+                        username TEXT NOT NULL UNIQUE,
+                        password_hash TEXT NOT NULL,
+                        created_at TEXT NOT NULL
+                    );
+                """)
+                _import_legacy_users(conn)
+                _initialized_path = path
+    return conn
+
+
+def _import_legacy_users(conn: sqlite3.Connection) -> None:
+    path = Config.USERS_FILE
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            users = json.load(f)
+    except Exception:
+        return
+    with conn:
+        conn.executemany(
+            'INSERT OR IGNORE INTO users (user_id, username, password_hash, created_at) VALUES (?, ?, ?, ?)',
+            [
+                (user['user_id'], username, user.get('password_hash', ''), user.get('created_at') or datetime.now().isoformat())
+                for username, user in users.items()
+            ],
+        )
+    try:
+        os.replace(path, f"{path}.migrated")
+    except FileNotFoundError:
+        # Another worker imported the same file (INSERT OR IGNORE) and renamed it first.
+        pass
+
+
+def _remember(user: Dict[str, Any]) -> Dict[str, Any]:
+    with _cache_lock:
+        _cache[user['user_id']] = user
+        _cache.move_to_end(user['user_id'])
+        while len(_cache) > USER_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return user
+
+
+def create_user(username: str, password_hash: str, user_id: str) -> Optional[Dict[str, Any]]:
+    user = {
+        'user_id': user_id,
+        'username': username,
+        'password_hash': password_hash,
+        'created_at': datetime.now().isoformat(),
+    }
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                'INSERT INTO users (user_id, username, password_hash, created_at) VALUES (?, ?, ?, ?)',
+                (user['user_id'], user['username'], user['password_hash'], user['created_at']),
+            )
+    except sqlite3.IntegrityError:
+        return None
+    return _remember(user)
+
+
+def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
+    row = _connect().execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    return _remember(dict(row)) if row else None
+
+
+def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        user = _cache.get(user_id)
+        if user is not None:
+            _cache.move_to_end(user_id)
+            return user
+    row = _connect().execute('SELECT * FROM users WHERE user_id = ?', (user_id,)).fetchone()
+    return _remember(dict(row)) if row else None
@@ -1,39 +1,351 @@
 import os
-import json
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import faiss
-from typing import List, Dict, Any, Tuple
-from sentence_transformers import SentenceTransformer
+import numpy as np
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from ..config import Config
+from ..utils.locks import FileLocks
+from .index_cache import index_cache
+from .index_factory import (
+    build_index, choose_index_kind, extract_vectors, index_kind, needs_rebuild, read_index_file, supports_remove,
+    write_index_file,
+)
+from .answer_cache import answer_cache
+from .metrics import CHUNKS_INDEXED, DOCUMENTS_INDEXED, stage_timer
+from .meta_store import MetaStore
+from .embedding_cache import EmbeddingCache
+from .embeddings import embedding_dimension, embedding_service
+from .embedding_client import get_embedding_client
 
 
-embedding_model = SentenceTransformer(Config.EMBEDDING_MODEL)
+_embedding_cache: Optional[EmbeddingCache] = None
+_user_locks = FileLocks(lambda: Config.VECTOR_DB_FOLDER)
+_rebuild_executor: Optional[ThreadPoolExecutor] = None
+_rebuild_executor_pid: Optional[int] = None
+_pending_rebuilds = set()
+_pending_lock = threading.Lock()
+logger = logging.getLogger(__name__)
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    global _embedding_cache
+    if _embedding_cache is None and Config.EMBEDDING_CACHE_MAX_ENTRIES > 0:
+        _embedding_cache = EmbeddingCache(
+            Config.EMBEDDING_CACHE_FOLDER,
+            Config.EMBEDDING_MODEL,
+            embedding_dimension(),
+            Config.EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+    return _embedding_cache
+
+
+def embedding_cache_stats() -> Optional[Dict[str, Any]]:
+    return _embedding_cache.stats() if _embedding_cache is not None else None
 
 
 def get_user_vector_paths(user_id: str) -> Tuple[str, str]:
     index_path = os.path.join(Config.VECTOR_DB_FOLDER, f"{user_id}_index.faiss")
-    meta_path = os.path.join(Config.VECTOR_DB_FOLDER, f"{user_id}_meta.json")
+    meta_path = os.path.join(Config.VECTOR_DB_FOLDER, f"{user_id}_meta.sqlite")
     return index_path, meta_path
 
 
-def create_vector_index(texts: List[str], metadata_list: List[Dict[str, Any]]):
-    embeddings = embedding_model.encode(texts)
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dimension)
-    faiss.normalize_L2(embeddings)
-    index.add(embeddings.astype('float32'))
-    return index, embeddings, metadata_list
+def _legacy_meta_path(user_id: str) -> str:
+    return os.path.join(Config.VECTOR_DB_FOLDER, f"{user_id}_meta.json")
+
+
+def get_meta_store(user_id: str) -> MetaStore:
+    _, meta_path = get_user_vector_paths(user_id)
+    store = MetaStore(meta_path)
+    legacy_path = _legacy_meta_path(user_id)
+    if not store.exists() and os.path.exists(legacy_path):
+        with _user_locks(user_id):
+            if not store.exists():
+                temp_path = f"{meta_path}.migrating"
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                MetaStore(temp_path).import_legacy_json(legacy_path)
+                os.replace(temp_path, meta_path)
+                os.remove(legacy_path)
+    return store
+
+
+def load_user_index(user_id: str):
+    index_path, _ = get_user_vector_paths(user_id)
+    return index_cache.get(user_id, index_path)
+
+
+def invalidate_user_index(user_id: str) -> None:
+    index_cache.invalidate(user_id)
+    answer_cache.invalidate(user_id)
+
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    with stage_timer('embedding'):
+        client = get_embedding_client()
+        if client is not None:
+            return client.encode(texts)
+        embeddings = embedding_service.encode(texts)
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+
+def embed_chunks(texts: List[str]) -> np.ndarray:
+    if not texts:
+        return np.zeros((0, embedding_dimension()), dtype='float32')
+    embedding_cache = get_embedding_cache()
+    if embedding_cache is None:
+        return encode_texts(texts)
+    cached = embedding_cache.get_many(texts)
+    missing = [position for position in range(len(texts)) if position not in cached]
+    if len(missing) == len(texts):
+        embeddings = encode_texts(texts)
+        embedding_cache.put_many(texts, embeddings)
+        return embeddings
+    embeddings = np.empty((len(texts), embedding_cache.dimension), dtype='float32')
+    for position, vector in cached.items():
+        embeddings[position] = vector
+    if missing:
+        missing_texts = [texts[position] for position in missing]
+        fresh = encode_texts(missing_texts)
+        embeddings[missing] = fresh
+        embedding_cache.put_many(missing_texts, fresh)
+    return embeddings
+
+
+def new_vector_index(dimension: int):
+    return faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+
+
+def _upgrade_legacy_index(index):
+    if isinstance(index, faiss.IndexIDMap) or index_kind(index) != 'flat':
+        return index
+    upgraded = new_vector_index(index.d)
+    if index.ntotal:
+        upgraded.add_with_ids(index.reconstruct_n(0, index.ntotal), np.arange(index.ntotal, dtype='int64'))
+    return upgraded
+
+
+def read_user_index(user_id: str):
+    index_path, _ = get_user_vector_paths(user_id)
+    if not os.path.exists(index_path):
+        return None
+    return _upgrade_legacy_index(read_index_file(index_path))
+
+
+def write_user_index(user_id: str, index) -> None:
+    index_path, _ = get_user_vector_paths(user_id)
+    with stage_timer('index_write'):
+        write_index_file(index, index_path)
+    invalidate_user_index(user_id)
+
 
+def delete_user_vectors(user_id: str) -> None:
+    # The emptied metadata store stays: its next_id counter keeps chunk ids from being reused.
+    index_path, _ = get_user_vector_paths(user_id)
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    invalidate_user_index(user_id)
 
-def search_similar_chunks(query: str, index, embeddings, metadata_list, k: int = 5):
-    query_embedding = embedding_model.encode([query])
-    faiss.normalize_L2(query_embedding)
-    scores, indices = index.search(query_embedding.astype('float32'), k)
+
+def add_user_document(user_id: str, document: Dict[str, Any], chunks: List[Dict[str, Any]],
+                      embeddings: Optional[np.ndarray] = None) -> int:
+    if embeddings is None:
+        embeddings = embed_chunks([chunk['text'] for chunk in chunks])
+    return add_user_document_batches(user_id, document, [(chunks, embeddings)])
+
+
+def add_user_document_batches(user_id: str, document: Dict[str, Any],
+                              batches: Iterable[Tuple[List[Dict[str, Any]], np.ndarray]]) -> int:
+    # Each batch is appended before the next is pulled, so only one is held at
+    # a time. The document row comes last: until then its chunks stay out of
+    # search results, and a failure removes them again.
+    file_id = document['file_id']
+    with _user_locks(user_id):
+        store = get_meta_store(user_id)
+        if store.get_document(file_id) is not None:
+            raise ValueError(f"Document {file_id} is already indexed")
+        # Rows left by an ingest of this file that died part way.
+        store.remove_chunks(file_id)
+        index = read_user_index(user_id)
+        chunk_count = 0
+        try:
+            for chunks, embeddings in batches:
+                if not chunks:
+                    continue
+                if index is None:
+                    index = new_vector_index(embeddings.shape[1])
+                elif index.d != embeddings.shape[1]:
+                    raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match stored index dimension {index.d}")
+                first_id = store.allocate_ids(len(chunks))
+                ids = np.arange(first_id, first_id + len(chunks), dtype='int64')
+                index.add_with_ids(embeddings, ids)
+                store.add_chunks(chunks, ids)
+                chunk_count += len(chunks)
+            if index is None:
+                index = new_vector_index(embedding_dimension())
+            write_user_index(user_id, index)
+        except Exception:
+            store.remove_chunks(file_id)
+            raise
+        document['chunk_count'] = chunk_count
+        store.add_document(document)
+        DOCUMENTS_INDEXED.inc()
+        CHUNKS_INDEXED.inc(chunk_count)
+        if needs_rebuild(index):
+            schedule_index_rebuild(user_id)
+        return index.ntotal
+
+
+def remove_user_document(user_id: str, file_id: str) -> Optional[Dict[str, Any]]:
+    with _user_locks(user_id):
+        store = get_meta_store(user_id)
+        if not store.exists():
+            return None
+        document = store.get_document(file_id)
+        if document is None:
+            return None
+        removed_ids = store.chunk_ids_for_file(file_id)
+        if store.remove_document(file_id) == 0:
+            delete_user_vectors(user_id)
+            return document
+        index = read_user_index(user_id)
+        if index is not None and removed_ids:
+            if supports_remove(index):
+                index.remove_ids(np.asarray(removed_ids, dtype='int64'))
+                write_user_index(user_id, index)
+            else:
+                invalidate_user_index(user_id)
+                schedule_index_rebuild(user_id)
+        if index is not None and needs_rebuild(index):
+            schedule_index_rebuild(user_id)
+        return document
+
+
+def schedule_index_rebuild(user_id: str) -> None:
+    global _rebuild_executor, _rebuild_executor_pid
+    with _pending_lock:
+        if user_id in _pending_rebuilds:
+            return
+        _pending_rebuilds.add(user_id)
+        if _rebuild_executor is None or _rebuild_executor_pid != os.getpid():
+            _rebuild_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='index-build')
+            _rebuild_executor_pid = os.getpid()
+        executor = _rebuild_executor
+    executor.submit(_run_index_rebuild, user_id)
+
+
+def _after_fork() -> None:
+    # Rebuilds queued in the parent run there; the child starts its own executor.
+    global _rebuild_executor, _pending_lock
+    _rebuild_executor = None
+    _pending_lock = threading.Lock()
+    _pending_rebuilds.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _run_index_rebuild(user_id: str) -> None:
+    with _pending_lock:
+        _pending_rebuilds.discard(user_id)
+    try:
+        rebuild_user_index(user_id)
+    except Exception:
+        logger.exception('Index rebuild failed for user %s', user_id)
+
+
+def rebuild_user_index(user_id: str):
+    with _user_locks(user_id):
+        index = read_user_index(user_id)
+        if index is None:
+            return None
+        ids, vectors = extract_vectors(index)
+    store = get_meta_store(user_id)
+    keep = np.isin(ids, np.asarray(store.chunk_ids(), dtype='int64'))
+    ids, vectors = ids[keep], vectors[keep]
+    rebuilt = build_index(choose_index_kind(len(ids)), vectors, ids)
+
+    with _user_locks(user_id):
+        current = read_user_index(user_id)
+        if current is None:
+            return None
+        live = np.asarray(store.chunk_ids(), dtype='int64')
+        added = live[~np.isin(live, ids)]
+        if len(added):
+            rebuilt.add_with_ids(current.reconstruct_batch(added), added)
+        removed = ids[~np.isin(ids, live)]
+        if len(removed) and supports_remove(rebuilt):
+            rebuilt.remove_ids(removed)
+        write_user_index(user_id, rebuilt)
+        return rebuilt
+
+
+def fuse_rankings(rankings: List[List[int]], k: int) -> List[Tuple[int, float]]:
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking):
+            scores[chunk_id] += 1.0 / (Config.RRF_K + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def search_similar_chunks(query: str, index, store: MetaStore, k: int = 5, query_embedding: Optional[np.ndarray] = None):
+    if query_embedding is None:
+        query_embedding = encode_texts([query])
+    candidates = max(k, Config.HYBRID_CANDIDATES) if Config.HYBRID_SEARCH else k
+    scores, ids = index.search(query_embedding, candidates)
+    hits = [(int(chunk_id), float(score)) for score, chunk_id in zip(scores[0], ids[0]) if chunk_id >= 0]
+    similarities = dict(hits)
+    fused: Dict[int, float] = {}
+    if Config.HYBRID_SEARCH:
+        keyword_hits = store.keyword_search(query, candidates, Config.KEYWORD_MAX_TERM_DOCS)
+        hits = fuse_rankings([[chunk_id for chunk_id, _ in hits], [chunk_id for chunk_id, _ in keyword_hits]], k)
+        fused = dict(hits)
+        # ``score`` stays the cosine similarity; keyword-only hits take it from the stored vector.
+        keyword_only = [chunk_id for chunk_id, _ in hits if chunk_id not in similarities]
+        if keyword_only:
+            try:
+                vectors = index.reconstruct_batch(np.asarray(keyword_only, dtype='int64'))
+                similarities.update(zip(keyword_only, (vectors @ query_embedding[0]).tolist()))
+            except RuntimeError:
+                pass  # a chunk added after this index snapshot was loaded
+    chunks = store.get_chunks(chunk_id for chunk_id, _ in hits)
     results = []
-    for score, idx in zip(scores[0], indices[0]):
-        if idx < len(metadata_list):
-            meta = metadata_list[idx]
-            metadata = meta.get('metadata', {}) if isinstance(meta, dict) else {}
-            results.append({'text': meta.get('text', ''), 'metadata': metadata, 'score': float(score)})
+    for chunk_id, _ in hits:
+        chunk = chunks.get(chunk_id)
+        if chunk is not None:
+            result = {'id': chunk_id, 'text': chunk['text'], 'metadata': chunk['metadata'],
+                      'score': similarities.get(chunk_id, 0.0)}
+            if chunk_id in fused:
+                result['rrf_score'] = fused[chunk_id]
+            results.append(result)
     return results
 
 
+def owner_vector_counts(owner_ids: List[str]) -> List[Optional[int]]:
+    client = get_embedding_client()
+    if client is not None:
+        return client.vector_counts(owner_ids)
+    indexes = [load_user_index(owner_id) for owner_id in owner_ids]
+    return [None if index is None else index.ntotal for index in indexes]
+
+
+def search_owners(query: str, owner_ids: List[str], k: int = 5, query_embedding: Optional[np.ndarray] = None):
+    if query_embedding is None:
+        query_embedding = encode_texts([query])
+    with stage_timer('search'):
+        client = get_embedding_client()
+        if client is not None:
+            return client.search(query, owner_ids, k, query_embedding)
+        results = []
+        for owner_id in owner_ids:
+            index = load_user_index(owner_id)
+            if index is None or index.ntotal == 0:
+                continue
+            for hit in search_similar_chunks(query, index, get_meta_store(owner_id), k, query_embedding):
+                hit['owner_id'] = owner_id
+                results.append(hit)
+        results.sort(key=lambda hit: hit.get('rrf_score', hit['score']), reverse=True)
+        return results[:k]
@@ -0,0 +1,128 @@
+"""Embedding and search sidecar shared by every web worker on a host.
+
+Run from apps/backend:
+
+    EMBEDDING_SERVER_URL=unix:///tmp/docbot-embeddings.sock python -m server.sidecar
+
+and start the web workers with the same ``EMBEDDING_SERVER_URL``. The
+sidecar owns the embedding model and the FAISS index cache. Concurrent
+``/encode`` calls from all workers are coalesced by ``EmbeddingService``,
+and the workers only keep ``EmbeddingClient``. Index and metadata files stay
+on the shared disk, so workers still write them directly and the sidecar's
+index cache picks up changes by mtime. ``http://127.0.0.1:<port>`` URLs
+serve over localhost TCP instead of a Unix socket.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import socketserver
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+from .config import Config
+from .services import embeddings
+from .services import vectors
+from .services.index_cache import index_cache
+
+logger = logging.getLogger(__name__)
+
+
+class SidecarHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def do_GET(self):
+        if self.path == '/info':
+            model = embeddings.get_embedding_model()
+            self._send_json({
+                'model': Config.EMBEDDING_MODEL,
+                'dimension': model.get_sentence_embedding_dimension(),
+                'max_seq_length': model.max_seq_length,
+            })
+        elif self.path == '/stats':
+            self._send_json({'embeddings': embeddings.embedding_service.stats(), 'index_cache': index_cache.stats()})
+        else:
+            self._send_json({'error': 'Not found'}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/encode':
+                encoded = vectors.encode_texts(body['texts'])
+                self._send(encoded.tobytes(), 'application/octet-stream', {'X-Dimension': str(encoded.shape[1])})
+            elif self.path == '/tokenize':
+                self._send_json({'lengths': embeddings.token_lengths(body['texts'])})
+            elif self.path == '/counts':
+                self._send_json({'counts': vectors.owner_vector_counts(body['owner_ids'])})
+            elif self.path == '/search':
+                query_embedding = np.asarray([body['embedding']], dtype='float32')
+                results = vectors.search_owners(body['query'], body['owner_ids'], body['k'], query_embedding)
+                self._send_json({'results': results})
+            else:
+                self._send_json({'error': 'Not found'}, 404)
+        except Exception as exc:
+            logger.exception('Sidecar request %s failed', self.path)
+            self._send_json({'error': str(exc)}, 500)
+
+    def _send_json(self, data, status: int = 200):
+        self._send(json.dumps(data).encode('utf-8'), 'application/json', status=status)
+
+    def _send(self, payload: bytes, content_type: str, headers=None, status: int = 200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class TCPSidecarHandler(SidecarHandler):
+    disable_nagle_algorithm = True
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(url: str):
+    parts = urlsplit(url)
+    if parts.scheme == 'unix':
+        path = parts.netloc + parts.path
+        if os.path.exists(path):
+            os.remove(path)
+        return ThreadingUnixHTTPServer(path, SidecarHandler)
+    server = ThreadingHTTPServer((parts.hostname or '127.0.0.1', parts.port or 8090), TCPSidecarHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=Config.EMBEDDING_SERVER_URL or 'http://127.0.0.1:8090')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    # The sidecar serves requests itself, so it must never forward them to EMBEDDING_SERVER_URL.
+    Config.EMBEDDING_SERVER_URL = ''
+    embeddings.get_embedding_model()
+    server = make_server(args.url)
+    logger.info('Embedding sidecar listening on %s', args.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
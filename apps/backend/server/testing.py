@@ -0,0 +1,73 @@
+import hashlib
+import os
+import sys
+from types import ModuleType, SimpleNamespace
+
+import numpy as np
+
+DIMENSION = 384
+
+
+class WhitespaceTokenizer:
+    def __call__(self, texts, **kwargs):
+        return {'input_ids': [text.split() for text in texts]}
+
+
+class HashingEncoder:
+    max_seq_length = 256
+    tokenizer = WhitespaceTokenizer()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return DIMENSION
+
+    def encode(self, texts, **kwargs):
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha1(text.encode('utf-8')).digest()[:4], 'little')
+            rows.append(np.random.default_rng(seed).standard_normal(DIMENSION))
+        return np.asarray(rows, dtype='float32')
+
+
+def stub_completion(**kwargs):
+    if kwargs.get('stream'):
+        return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content='stub answer'))])])
+    message = SimpleNamespace(content='stub answer')
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def configure(workdir: str, stub_embeddings: bool, llm_base_url: str = None):
+    """Point every data path at ``workdir`` and return a fresh app.
+
+    ``stub_embeddings`` swaps SentenceTransformer for ``HashingEncoder``;
+    without ``llm_base_url`` chat completions return a fixed stub answer.
+    Used by the test suite and the benchmarks.
+    """
+    if stub_embeddings:
+        module = sys.modules.get('sentence_transformers') or ModuleType('sentence_transformers')
+        module.SentenceTransformer = HashingEncoder
+        sys.modules['sentence_transformers'] = module
+
+    from .config import Config
+    Config.UPLOAD_FOLDER = os.path.join(workdir, 'uploads')
+    Config.VECTOR_DB_FOLDER = os.path.join(workdir, 'vector_db')
+    Config.HISTORY_FOLDER = os.path.join(workdir, 'histories')
+    Config.USERS_FILE = os.path.join(workdir, 'users.json')
+    Config.USERS_DB = os.path.join(workdir, 'users.sqlite')
+    Config.EMBEDDING_CACHE_FOLDER = os.path.join(workdir, 'embedding_cache')
+    Config.JOBS_DB = os.path.join(workdir, 'jobs.sqlite')
+    Config.JOB_WORKERS_FOLDER = os.path.join(workdir, 'job_workers')
+    Config.COLLECTIONS_DB = os.path.join(workdir, 'collections.sqlite')
+    Config.CONTENT_DB = os.path.join(workdir, 'content.sqlite')
+
+    if llm_base_url:
+        Config.OPENAI_BASE_URL = llm_base_url
+        Config.OPENAI_API_KEY = Config.OPENAI_API_KEY or 'stub'
+    else:
+        import openai
+        openai.chat.completions.create = stub_completion
+
+    from . import create_app
+    return create_app()
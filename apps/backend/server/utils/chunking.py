@@ -0,0 +1,129 @@
+import re
+from collections import deque
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Callable
+
+
+SENTENCE_BOUNDARY = re.compile(r'[.!?]["\')\]]*\s+|\n\s*')
+MAX_CARRY = 16 * 1024
+
+LengthFunction = Callable[[List[str]], List[int]]
+
+
+def char_lengths(texts: List[str]) -> List[int]:
+    return [len(text) for text in texts]
+
+
+def _split_sentences(text: str, final: bool) -> Tuple[List[str], str]:
+    sentences = []
+    position = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentences.append(text[position:match.end()])
+        position = match.end()
+    rest = text[position:]
+    if final and rest:
+        sentences.append(rest)
+        rest = ''
+    return sentences, rest
+
+
+def _hard_split(sentence: str, size: int, max_size: int) -> List[str]:
+    pieces = []
+    piece_chars = max(1, int(len(sentence) * max_size / size * 0.9))
+    start = 0
+    while start < len(sentence):
+        end = min(start + piece_chars, len(sentence))
+        if end < len(sentence):
+            space = sentence.rfind(' ', start + piece_chars // 2, end)
+            if space != -1:
+                end = space + 1
+        pieces.append(sentence[start:end])
+        start = end
+    return pieces
+
+
+def _page_at(page_starts: List[Tuple[int, int]], offset: int) -> int:
+    for start, page in reversed(page_starts):
+        if start <= offset:
+            return page
+    return page_starts[0][1]
+
+
+def _iter_units(pages: Iterable[Tuple[int, str]], max_size: int,
+                length_fn: LengthFunction) -> Iterator[Tuple[str, int, int, int]]:
+    offset = 0
+    carry = ''
+    page_starts: List[Tuple[int, int]] = []
+    for page, text in pages:
+        page_starts.append((offset + len(carry), page))
+        sentences, carry = _split_sentences(carry + text, final=len(carry) + len(text) > MAX_CARRY)
+        if sentences:
+            yield from _measure(sentences, offset, page_starts, max_size, length_fn)
+            offset += sum(len(sentence) for sentence in sentences)
+            current = max(i for i, (start, _) in enumerate(page_starts) if start <= offset)
+            page_starts = page_starts[current:]
+    if carry:
+        yield from _measure([carry], offset, page_starts, max_size, length_fn)
+
+
+def _measure(sentences: List[str], offset: int, page_starts: List[Tuple[int, int]], max_size: int,
+             length_fn: LengthFunction) -> Iterator[Tuple[str, int, int, int]]:
+    sizes = length_fn(sentences)
+    for sentence, size in zip(sentences, sizes):
+        if size <= max_size or len(sentence) <= 1:
+            yield sentence, size, offset, _page_at(page_starts, offset)
+        else:
+            yield from _measure(_hard_split(sentence, size, max_size), offset, page_starts, max_size, length_fn)
+        offset += len(sentence)
+
+
+def _build_chunk(units: 'deque[Tuple[str, int, int, int]]') -> Dict[str, Any]:
+    raw = ''.join(unit[0] for unit in units)
+    text = raw.strip()
+    start = units[0][2] + (len(raw) - len(raw.lstrip()))
+    return {
+        'text': text,
+        'start': start,
+        'end': start + len(text),
+        'page': units[0][3],
+        'page_end': units[-1][3],
+        'size': sum(unit[1] for unit in units),
+    }
+
+
+def iter_text_chunks(pages: Iterable[Tuple[int, str]], max_size: int = 1000, overlap: int = 200,
+                     length_fn: LengthFunction = char_lengths) -> Iterator[Dict[str, Any]]:
+    """Single-pass, sentence-aware chunker over ``(page_number, text)`` segments.
+
+    Sizes are measured with ``length_fn`` (characters by default, or token
+    counts from the embedding tokenizer), so no chunk exceeds ``max_size``
+    unless one unsplittable word does. Each chunk carries its character
+    offsets in the extracted text and its first and last page.
+    """
+    units: 'deque[Tuple[str, int, int, int]]' = deque()
+    size = 0
+    fresh = 0
+    for unit in _iter_units(pages, max_size, length_fn):
+        if size + unit[1] > max_size and fresh:
+            yield _build_chunk(units)
+            fresh = 0
+            units = _overlap_tail(units, overlap)
+            size = sum(u[1] for u in units)
+        while units and size + unit[1] > max_size:
+            size -= units.popleft()[1]
+        units.append(unit)
+        size += unit[1]
+        if unit[0].strip():
+            fresh += 1
+    if fresh:
+        yield _build_chunk(units)
+
+
+def _overlap_tail(units: 'deque[Tuple[str, int, int, int]]', overlap: int) -> 'deque[Tuple[str, int, int, int]]':
+    tail: 'deque[Tuple[str, int, int, int]]' = deque()
+    kept = 0
+    for unit in reversed(units):
+        if kept + unit[1] > overlap or len(tail) + 1 >= len(units):
+            break
+        tail.appendleft(unit)
+        kept += unit[1]
+    return tail
@@ -1,5 +1,7 @@
-import os
-from typing import List
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Iterator, Tuple
 import PyPDF2
 import docx
 from ..config import Config
@@ -9,28 +11,77 @@ def allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
 
-def extract_text_from_file(file_path: str, filename: str) -> str:
+TEXT_READ_SIZE = 64 * 1024
+
+
+_worker_pdf = None
+
+
+def _open_pdf_worker(file_path: str) -> None:
+    global _worker_pdf
+    _worker_pdf = PyPDF2.PdfReader(file_path)
+
+
+def _extract_pdf_pages(start: int, stop: int) -> List[str]:
+    return [(_worker_pdf.pages[i].extract_text() or '') for i in range(start, stop)]
+
+
+def _pdf_pool_context():
+    # Never fork: extraction runs on ingest threads, and forking a threaded process can deadlock.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _iter_pdf_pages(file_path: str) -> Iterator[Tuple[int, str]]:
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        if Config.PDF_EXTRACT_PROCESSES <= 1 or page_count < Config.PDF_PARALLEL_MIN_PAGES:
+            for page_number, page in enumerate(pdf_reader.pages, start=1):
+                yield page_number, (page.extract_text() or '') + "\n"
+            return
+
+    step = Config.PDF_PAGES_PER_TASK
+    ranges = deque((start, min(start + step, page_count)) for start in range(0, page_count, step))
+    with ProcessPoolExecutor(
+        max_workers=Config.PDF_EXTRACT_PROCESSES,
+        mp_context=_pdf_pool_context(),
+        initializer=_open_pdf_worker,
+        initargs=(file_path,),
+    ) as executor:
+        in_flight = deque()
+        while ranges or in_flight:
+            while ranges and len(in_flight) < Config.PDF_EXTRACT_PROCESSES * 2:
+                start, stop = ranges.popleft()
+                in_flight.append((start, executor.submit(_extract_pdf_pages, start, stop)))
+            start, future = in_flight.popleft()
+            for offset, text in enumerate(future.result()):
+                yield start + offset + 1, text + "\n"
+
+
+def iter_text_from_file(file_path: str, filename: str) -> Iterator[Tuple[int, str]]:
     file_extension = filename.rsplit('.', 1)[1].lower()
     if file_extension == 'txt':
         with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+            while True:
+                block = file.read(TEXT_READ_SIZE)
+                if not block:
+                    break
+                yield 1, block
     elif file_extension == 'pdf':
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+        yield from _iter_pdf_pages(file_path)
     elif file_extension in ['docx', 'doc']:
         d = docx.Document(file_path)
-        text = ""
         for paragraph in d.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+            yield 1, paragraph.text + "\n"
     else:
         raise ValueError(f"Unsupported file type: {file_extension}")
 
 
+def extract_text_from_file(file_path: str, filename: str) -> str:
+    return "".join(text for _, text in iter_text_from_file(file_path, filename))
+
+
 def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
     if len(text) <= chunk_size:
         return [text]
@@ -53,3 +104,4 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[st
     return chunks
 
 
+
@@ -0,0 +1,54 @@
+import os
+import fcntl
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator
+
+
+class FileLocks:
+    """Per-key exclusive locks shared by threads and worker processes.
+
+    Each key pairs a reentrant in-process lock with an ``fcntl`` lock on
+    ``<folder>/<key>.lock``, so writers for the same key take turns across
+    gunicorn workers while unrelated keys never contend.
+    """
+
+    def __init__(self, folder: Callable[[], str]):
+        self.folder = folder
+        self._reset()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _reset(self) -> None:
+        self._states: Dict[str, Dict[str, Any]] = defaultdict(lambda: {'lock': threading.RLock(), 'depth': 0, 'fd': None})
+        self._states_lock = threading.Lock()
+
+    def _after_fork(self) -> None:
+        # Locks held by the parent's other threads would never be released in the child.
+        for state in self._states.values():
+            if state['fd'] is not None:
+                os.close(state['fd'])
+        self._reset()
+
+    @contextmanager
+    def __call__(self, key: str) -> Iterator[None]:
+        with self._states_lock:
+            state = self._states[key]
+        with state['lock']:
+            if state['depth'] == 0:
+                fd = os.open(os.path.join(self.folder(), f"{key}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                state['fd'] = fd
+            state['depth'] += 1
+            try:
+                yield
+            finally:
+                state['depth'] -= 1
+                if state['depth'] == 0:
+                    fd, state['fd'] = state['fd'], None
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
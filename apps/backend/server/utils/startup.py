@@ -0,0 +1,30 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+# Imported first by the ``server`` package, so this marks when its imports began.
+IMPORTS_STARTED = time.perf_counter()
+
+_timings: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def record(stage: str, seconds: float) -> None:
+    with _lock:
+        _timings[stage] = round(seconds, 4)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def startup_timings() -> Dict[str, float]:
+    with _lock:
+        return dict(_timings)
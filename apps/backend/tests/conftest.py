@@ -0,0 +1,54 @@
+import io
+import time
+import uuid
+
+import pytest
+
+from server.testing import configure
+from benchmarks.stub_llm import start_stub_llm
+
+
+@pytest.fixture(scope='session')
+def stub_llm():
+    server, base_url = start_stub_llm(first_token_ms=0, token_ms=0)
+    yield base_url
+    server.shutdown()
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory, stub_llm):
+    # Services open their databases once per process, so every test shares
+    # one data directory and isolates itself with a fresh ``user_id``.
+    return configure(str(tmp_path_factory.mktemp('data')), stub_embeddings=True, llm_base_url=stub_llm)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user_id():
+    return f'user-{uuid.uuid4().hex[:8]}'
+
+
+@pytest.fixture
+def upload(client):
+    def upload(user_id, filename, content, timeout=30):
+        resp = client.post(
+            '/api/upload',
+            data={'files': [(io.BytesIO(content), filename)]},
+            headers={'X-User-Id': user_id},
+            content_type='multipart/form-data',
+        )
+        assert resp.status_code == 202, resp.get_data(as_text=True)
+        job_id = resp.get_json()['job_id']
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = client.get(f'/api/jobs/{job_id}', headers={'X-User-Id': user_id}).get_json()
+            if job['status'] not in ('queued', 'running'):
+                return job
+            time.sleep(0.01)
+        raise AssertionError(f'job {job_id} did not finish within {timeout}s')
+
+    return upload
@@ -0,0 +1,40 @@
+from server.services.answer_cache import answer_cache
+from server.services.vectors import get_meta_store
+
+
+def _ask(client, user_id, query):
+    resp = client.post('/api/chat', json={'query': query}, headers={'X-User-Id': user_id})
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    return resp.get_json()
+
+
+def test_repeated_question_is_cached(client, upload, user_id):
+    upload(user_id, 'apples.txt', b'Apples are red and grow on trees. ' * 10)
+
+    assert _ask(client, user_id, 'What colour are apples?')['cached'] is False
+    assert _ask(client, user_id, 'What colour are apples?')['cached'] is True
+
+
+def test_chunk_ids_are_not_reused_after_last_document_is_deleted(client, upload, user_id):
+    job = upload(user_id, 'old.txt', b'Old document about apples. ' * 10)
+    old_ids = set(get_meta_store(user_id).chunk_ids())
+    resp = client.delete(f"/api/documents/{job['files'][0]['file_id']}", headers={'X-User-Id': user_id})
+    assert resp.status_code == 200
+
+    upload(user_id, 'new.txt', b'New document about pears. ' * 10)
+
+    assert old_ids.isdisjoint(get_meta_store(user_id).chunk_ids())
+
+
+def test_other_worker_does_not_serve_answer_for_replaced_document(client, upload, user_id, monkeypatch):
+    job = upload(user_id, 'old.txt', b'Old document about apples. ' * 10)
+    _ask(client, user_id, 'What is the document about?')
+
+    # Another worker's cache never sees this process's invalidations.
+    monkeypatch.setattr(answer_cache, 'invalidate', lambda user_id: None)
+    client.delete(f"/api/documents/{job['files'][0]['file_id']}", headers={'X-User-Id': user_id})
+    upload(user_id, 'new.txt', b'New document about pears. ' * 10)
+
+    body = _ask(client, user_id, 'What is the document about?')
+    assert body['cached'] is False
+    assert [source['filename'] for source in body['sources']] == ['new.txt']
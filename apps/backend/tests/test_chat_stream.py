@@ -0,0 +1,55 @@
+import json
+
+from benchmarks.stub_llm import REPLY, _tokens
+
+
+def _events(body):
+    assert body.endswith('\n\n')
+    events = []
+    for block in body[:-2].split('\n\n'):
+        event_line, data_line = block.split('\n')
+        assert event_line.startswith('event: ')
+        assert data_line.startswith('data: ')
+        events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    return events
+
+
+def _stream(client, user_id, query):
+    resp = client.post('/api/chat/stream', json={'query': query}, headers={'X-User-Id': user_id})
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/event-stream'
+    assert resp.headers['Cache-Control'] == 'no-cache'
+    return _events(resp.get_data(as_text=True))
+
+
+def test_stream_relays_llm_tokens_in_order(client, upload, user_id):
+    upload(user_id, 'manual.txt', b'The valve assembly is tightened to 40 Nm. ' * 20)
+
+    events = _stream(client, user_id, 'How tight is the valve assembly?')
+
+    names = [name for name, _ in events]
+    assert names[0] == 'sources'
+    assert names[-1] == 'done'
+    assert set(names[1:-1]) == {'token'}
+    assert events[0][1]['query'] == 'How tight is the valve assembly?'
+    assert events[0][1]['sources'][0]['filename'] == 'manual.txt'
+    assert [data['text'] for name, data in events if name == 'token'] == _tokens(REPLY)
+    assert events[-1][1] == {'answer': REPLY, 'cached': False}
+
+
+def test_stream_repeated_question_is_served_from_cache(client, upload, user_id):
+    upload(user_id, 'manual.txt', b'The valve assembly is tightened to 40 Nm. ' * 20)
+    _stream(client, user_id, 'How tight is the valve assembly?')
+
+    events = _stream(client, user_id, 'How tight is the valve assembly?')
+
+    assert [name for name, _ in events] == ['sources', 'token', 'done']
+    assert events[1][1] == {'text': REPLY}
+    assert events[-1][1] == {'answer': REPLY, 'cached': True}
+
+
+def test_stream_without_documents_returns_json_error(client, user_id):
+    resp = client.post('/api/chat/stream', json={'query': 'anything'}, headers={'X-User-Id': user_id})
+
+    assert resp.status_code == 400
+    assert 'error' in resp.get_json()
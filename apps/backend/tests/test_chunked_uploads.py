@@ -0,0 +1,225 @@
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from server.config import Config
+from server.blueprints import uploads
+from server.services import chunked_uploads
+from server.services.chunked_uploads import (
+    UploadConflict, abort_session, complete_session, create_session, finish_upload, get_session, write_part,
+)
+
+CONTENT = b'Chunked upload text about hydraulic pumps. ' * 200
+PART_SIZE = 1024
+
+
+def _create(client, user_id, **data):
+    data = {'filename': 'big.txt', 'size': len(CONTENT), 'part_size': PART_SIZE, **data}
+    return client.post('/api/uploads', json=data, headers={'X-User-Id': user_id})
+
+
+def _put_parts(client, user_id, session):
+    for index in session['missing_parts']:
+        resp = client.put(
+            f"/api/uploads/{session['upload_id']}/parts/{index}",
+            data=CONTENT[index * PART_SIZE:(index + 1) * PART_SIZE],
+            headers={'X-User-Id': user_id},
+            content_type='application/octet-stream',
+        )
+        assert resp.status_code == 200, resp.get_json()
+
+
+def _complete(client, user_id, upload_id, **data):
+    return client.post(f'/api/uploads/{upload_id}/complete', json=data, headers={'X-User-Id': user_id})
+
+
+def _wait(client, user_id, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/jobs/{job_id}', headers={'X-User-Id': user_id}).get_json()
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+@pytest.mark.parametrize('part_size', [0, -1, '', False, 'abc'])
+def test_invalid_part_size_is_rejected(client, user_id, part_size):
+    assert _create(client, user_id, part_size=part_size).status_code == 400
+
+
+def test_missing_part_size_uses_default(client, user_id):
+    data = {'filename': 'big.txt', 'size': len(CONTENT)}
+    resp = client.post('/api/uploads', json=data, headers={'X-User-Id': user_id})
+
+    assert resp.status_code == 201
+    assert resp.get_json()['part_size'] == Config.UPLOAD_PART_SIZE
+
+
+def test_complete_is_idempotent(client, user_id):
+    session = _create(client, user_id).get_json()
+    _put_parts(client, user_id, session)
+
+    first = _complete(client, user_id, session['upload_id'], sha256=hashlib.sha256(CONTENT).hexdigest())
+    second = _complete(client, user_id, session['upload_id'])
+
+    assert first.status_code == 202
+    assert second.status_code in (202, 404)
+    if second.status_code == 202:
+        assert second.get_json()['job_id'] == first.get_json()['job_id']
+    job = _wait(client, user_id, first.get_json()['job_id'])
+    assert job['status'] == 'completed'
+    assert job['files'][0]['chunk_count'] > 0
+    assert client.get(f"/api/uploads/{session['upload_id']}", headers={'X-User-Id': user_id}).status_code == 404
+
+
+def test_complete_after_the_job_dropped_the_session_is_not_found(client, user_id, monkeypatch):
+    session = _create(client, user_id).get_json()
+    _put_parts(client, user_id, session)
+    stale = get_session(user_id, session['upload_id'])
+    abort_session(session['upload_id'])
+    monkeypatch.setattr(uploads, 'get_session', lambda user_id, upload_id: stale)
+
+    assert _complete(client, user_id, session['upload_id']).status_code == 404
+
+
+def test_hash_mismatch_fails_the_job_and_reopens_the_upload(client, user_id):
+    session = _create(client, user_id).get_json()
+    _put_parts(client, user_id, session)
+
+    resp = _complete(client, user_id, session['upload_id'], sha256='0' * 64)
+    job = _wait(client, user_id, resp.get_json()['job_id'])
+
+    assert job['status'] == 'failed'
+    assert 'SHA-256 mismatch' in job['files'][0]['error']
+    reopened = client.get(f"/api/uploads/{session['upload_id']}", headers={'X-User-Id': user_id}).get_json()
+    assert reopened['status'] == 'uploading'
+
+    resp = _complete(client, user_id, session['upload_id'], sha256=hashlib.sha256(CONTENT).hexdigest())
+    assert _wait(client, user_id, resp.get_json()['job_id'])['status'] == 'completed'
+
+
+def test_sessions_expire_by_last_activity(client, user_id, monkeypatch):
+    monkeypatch.setattr(Config, 'UPLOAD_SESSION_TTL_HOURS', 1)
+    active = _create(client, user_id).get_json()
+    idle = _create(client, user_id).get_json()
+    old = (datetime.now() - timedelta(hours=2)).isoformat()
+    conn = sqlite3.connect(Config.CONTENT_DB)
+    with conn:
+        conn.execute('UPDATE upload_sessions SET created_at = ? WHERE upload_id = ?', (old, active['upload_id']))
+        conn.execute(
+            'UPDATE upload_sessions SET created_at = ?, updated_at = ? WHERE upload_id = ?',
+            (old, old, idle['upload_id']),
+        )
+    conn.close()
+
+    _create(client, user_id)
+
+    uploads = client.get('/api/uploads', headers={'X-User-Id': user_id}).get_json()['uploads']
+    upload_ids = {upload['upload_id'] for upload in uploads}
+    assert active['upload_id'] in upload_ids
+    assert idle['upload_id'] not in upload_ids
+
+
+def _uploaded(user_id, content):
+    session = create_session(user_id, 'race.txt', len(content), PART_SIZE)
+    for index in range(session['part_count']):
+        part = content[index * PART_SIZE:(index + 1) * PART_SIZE]
+        write_part(session, index, io.BytesIO(part), len(part))
+    return get_session(user_id, session['upload_id'])
+
+
+def _refcount(content_hash):
+    conn = sqlite3.connect(Config.CONTENT_DB)
+    try:
+        return conn.execute('SELECT refcount FROM blobs WHERE content_hash = ?', (content_hash,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+class _SlowStream:
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+        self.reading = threading.Event()
+        self.release = threading.Event()
+
+    def read(self, size):
+        self.reading.set()
+        self.release.wait(5)
+        return self.data.read(size)
+
+
+def test_complete_waits_for_a_part_being_written(user_id):
+    content = f'{user_id} racing part. '.encode() * 100
+    session = _uploaded(user_id, b'x' * PART_SIZE + content[PART_SIZE:])
+    stream = _SlowStream(content[:PART_SIZE])
+    writer = threading.Thread(target=write_part, args=(session, 0, stream, PART_SIZE))
+    writer.start()
+    stream.reading.wait(5)
+    completer = threading.Thread(target=complete_session, args=(session,))
+    completer.start()
+
+    completer.join(0.3)
+    assert completer.is_alive()
+    stream.release.set()
+    writer.join(5)
+    completer.join(5)
+
+    file_path, content_hash = finish_upload(session['upload_id'])
+    abort_session(session['upload_id'])
+    assert content_hash == hashlib.sha256(content).hexdigest()
+    with open(file_path, 'rb') as f:
+        assert f.read() == content
+
+
+def test_part_after_complete_is_rejected(user_id):
+    content = f'{user_id} late part. '.encode() * 100
+    stale = _uploaded(user_id, content)
+    complete_session(stale)
+
+    with pytest.raises(UploadConflict):
+        write_part(stale, 0, io.BytesIO(b'y' * PART_SIZE), PART_SIZE)
+    abort_session(stale['upload_id'])
+
+
+def test_finish_upload_after_a_crash_reuses_the_stored_blob(user_id):
+    content = f'{user_id} stored before the crash. '.encode() * 100
+    session = _uploaded(user_id, content)
+    complete_session(session)
+
+    first = finish_upload(session['upload_id'])
+    # The job died here, before dropping the session.
+    second = finish_upload(session['upload_id'])
+    abort_session(session['upload_id'])
+
+    assert second == first
+    assert _refcount(first[1]) == 1
+
+
+def test_finish_upload_after_a_store_died_before_committing(user_id, monkeypatch):
+    content = f'{user_id} moved but not committed. '.encode() * 100
+    session = _uploaded(user_id, content)
+    complete_session(session)
+    store_blob = chunked_uploads.store_blob
+
+    def crashing_store(*args, on_stored, **kwargs):
+        def crash(conn, file_path):
+            raise RuntimeError('crashed')
+        return store_blob(*args, on_stored=crash, **kwargs)
+
+    monkeypatch.setattr(chunked_uploads, 'store_blob', crashing_store)
+    with pytest.raises(RuntimeError):
+        finish_upload(session['upload_id'])
+    monkeypatch.undo()
+
+    file_path, content_hash = finish_upload(session['upload_id'])
+    abort_session(session['upload_id'])
+    assert content_hash == hashlib.sha256(content).hexdigest()
+    assert os.path.exists(file_path)
+    assert _refcount(content_hash) == 1
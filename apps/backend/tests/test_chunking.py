@@ -0,0 +1,25 @@
+from server.utils.chunking import iter_text_chunks
+
+
+def test_hard_split_pieces_take_their_own_page():
+    # One sentence with no boundary runs from page 1 across pages 2 and 3.
+    pages = [(1, 'word ' * 100), (2, 'word ' * 100), (3, 'word ' * 100 + 'end.')]
+    chunks = list(iter_text_chunks(pages, max_size=200, overlap=0))
+    text = ''.join(text for _, text in pages)
+
+    assert len(chunks) > 3
+    for chunk in chunks:
+        assert text[chunk['start']:chunk['end']] == chunk['text']
+        assert chunk['page'] == 1 + min(chunk['start'] // 500, 2)
+    assert {chunk['page'] for chunk in chunks} == {1, 2, 3}
+
+
+def test_sentences_keep_page_of_their_start():
+    pages = [(1, 'First page sentence. Runs onto '), (2, 'the second page. Second page only.\n')]
+    chunks = list(iter_text_chunks(pages, max_size=30, overlap=0))
+
+    assert [(c['text'], c['page']) for c in chunks] == [
+        ('First page sentence.', 1),
+        ('Runs onto the second page.', 1),
+        ('Second page only.', 2),
+    ]
@@ -0,0 +1,82 @@
+import threading
+
+import numpy as np
+
+from server.services.embedding_cache import EmbeddingCache
+
+DIMENSION = 8
+
+
+def _vector(text):
+    return np.full(DIMENSION, float(int(text.split('-')[1])), dtype='float32')
+
+
+def test_get_many_returns_stored_vectors(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'model', DIMENSION, 10)
+    cache.put_many(['text-1', 'text-2'], np.stack([_vector('text-1'), _vector('text-2')]))
+
+    found = cache.get_many(['text-2', 'missing-0', 'text-1'])
+
+    assert sorted(found) == [0, 2]
+    assert np.array_equal(found[0], _vector('text-2'))
+    assert np.array_equal(found[2], _vector('text-1'))
+
+
+def test_concurrent_eviction_never_returns_another_texts_vector(tmp_path):
+    # Separate instances have separate SQLite connections, like separate workers.
+    caches = [EmbeddingCache(str(tmp_path), 'model', DIMENSION, 16) for _ in range(4)]
+    errors = []
+
+    def worker(cache, offset):
+        for round_ in range(150):
+            texts = [f'text-{(offset + round_ + i) % 64}' for i in range(8)]
+            for position, vector in cache.get_many(texts).items():
+                if not np.array_equal(vector, _vector(texts[position])):
+                    errors.append((texts[position], vector[0]))
+            cache.put_many(texts, np.stack([_vector(text) for text in texts]))
+
+    threads = [threading.Thread(target=worker, args=(cache, i * 16)) for i, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+def test_changing_capacity_starts_a_fresh_cache(tmp_path):
+    EmbeddingCache(str(tmp_path), 'model', DIMENSION, 10).put_many(
+        [f'text-{i}' for i in range(1, 10)], np.stack([_vector(f'text-{i}') for i in range(1, 10)]),
+    )
+
+    smaller = EmbeddingCache(str(tmp_path), 'model', DIMENSION, 4)
+
+    assert smaller.get_many(['text-1', 'text-9']) == {}
+
+
+def test_lookups_do_not_wait_for_the_write_lock(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'model', DIMENSION, 10)
+    cache.put_many(['text-1'], np.stack([_vector('text-1')]))
+    writer = EmbeddingCache(str(tmp_path), 'model', DIMENSION, 10)
+    writer._open()
+    writer._conn.execute('BEGIN IMMEDIATE')
+    found = []
+    try:
+        reader = threading.Thread(target=lambda: found.append(cache.get_many(['text-1'])))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    finally:
+        writer._conn.execute('ROLLBACK')
+    assert np.array_equal(found[0][0], _vector('text-1'))
+
+
+def test_recently_read_entries_survive_eviction(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 'model', DIMENSION, 2)
+    cache.put_many(['text-1'], np.stack([_vector('text-1')]))
+    cache.put_many(['text-2'], np.stack([_vector('text-2')]))
+    cache.get_many(['text-1'])
+
+    cache.put_many(['text-3'], np.stack([_vector('text-3')]))
+
+    assert sorted(cache.get_many(['text-1', 'text-2', 'text-3'])) == [0, 2]
@@ -0,0 +1,72 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from server.config import Config
+from server.services.embedding_client import EmbeddingClient
+
+
+@pytest.fixture
+def sidecar():
+    batches = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            texts = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['texts']
+            batches.append((self.path, texts))
+            if self.path == '/encode':
+                payload = np.asarray([[float(text)] * 2 for text in texts], dtype='float32').tobytes()
+                content_type, headers = 'application/octet-stream', {'X-Dimension': '2'}
+            else:
+                payload = json.dumps({'lengths': [len(text) for text in texts]}).encode('utf-8')
+                content_type, headers = 'application/json', {}
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}', batches
+    server.shutdown()
+
+
+def test_encode_splits_texts_into_batches(sidecar):
+    url, batches = sidecar
+    client = EmbeddingClient(url, timeout=5, batch_size=4)
+    texts = [str(i) for i in range(10)]
+
+    encoded = client.encode(texts)
+
+    assert [len(batch) for path, batch in batches] == [4, 4, 2]
+    assert encoded.shape == (10, 2)
+    assert np.array_equal(encoded[:, 0], np.arange(10, dtype='float32'))
+
+
+def test_token_lengths_splits_texts_into_batches(sidecar):
+    url, batches = sidecar
+    client = EmbeddingClient(url, timeout=5, batch_size=3)
+
+    assert client.token_lengths(['a', 'bb', 'ccc', 'dddd']) == [1, 2, 3, 4]
+    assert [len(batch) for path, batch in batches] == [3, 1]
+
+
+def test_stats_reports_unreachable_sidecar(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'EMBEDDING_SERVER_URL', f"unix://{tmp_path / 'missing.sock'}")
+
+    resp = client.get('/api/stats')
+
+    assert resp.status_code == 200
+    assert 'unavailable' in resp.get_json()['sidecar']['error']
@@ -0,0 +1,18 @@
+from benchmarks.corpus import make_pdf
+from server.config import Config
+from server.utils.files import iter_text_from_file
+
+
+def test_parallel_pdf_extraction_matches_serial(tmp_path, monkeypatch):
+    text = '\n'.join(f'Line {i} of the maintenance manual.' for i in range(2000))
+    path = tmp_path / 'manual.pdf'
+    path.write_bytes(make_pdf(text))
+    serial = list(iter_text_from_file(str(path), 'manual.pdf'))
+
+    monkeypatch.setattr(Config, 'PDF_EXTRACT_PROCESSES', 2)
+    monkeypatch.setattr(Config, 'PDF_PARALLEL_MIN_PAGES', 8)
+    monkeypatch.setattr(Config, 'PDF_PAGES_PER_TASK', 4)
+    parallel = list(iter_text_from_file(str(path), 'manual.pdf'))
+
+    assert len(serial) == 40
+    assert parallel == serial
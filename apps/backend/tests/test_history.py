@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.mark.parametrize('query', ['limit=-1', 'limit=0', 'offset=-1', 'limit=abc'])
+def test_invalid_paging_is_rejected(client, user_id, query):
+    resp = client.get(f'/api/history?{query}', headers={'X-User-Id': user_id})
+
+    assert resp.status_code == 400
+
+
+def test_history_pages_newest_first(client, upload, user_id):
+    upload(user_id, 'manual.txt', b'The valve assembly is tightened to 40 Nm. ' * 10)
+    for i in range(3):
+        client.post('/api/chat', json={'query': f'question {i}'}, headers={'X-User-Id': user_id})
+
+    first = client.get('/api/history?limit=2', headers={'X-User-Id': user_id}).get_json()
+    second = client.get(f"/api/history?limit=2&offset={first['next_offset']}", headers={'X-User-Id': user_id}).get_json()
+
+    assert len(first['history']) == 2
+    assert len(second['history']) == 1
+    assert second['next_offset'] is None
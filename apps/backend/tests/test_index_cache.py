@@ -0,0 +1,40 @@
+import os
+
+import faiss
+import numpy as np
+
+from server.services.index_cache import IndexCache
+from server.services.index_factory import build_index
+
+
+def _write(path, count):
+    vectors = np.random.default_rng(count).standard_normal((count, 8)).astype('float32')
+    faiss.write_index(build_index('flat', vectors, np.arange(count)), path)
+
+
+def test_replaced_index_with_same_mtime_is_reloaded(tmp_path):
+    path = str(tmp_path / 'index.faiss')
+    _write(path, 3)
+    cache = IndexCache(max_bytes=1 << 20)
+    assert cache.get('u', path).ntotal == 3
+
+    # Another worker replaces the file within one timestamp tick.
+    mtime_ns = os.stat(path).st_mtime_ns
+    _write(path + '.tmp', 5)
+    os.utime(path + '.tmp', ns=(mtime_ns, mtime_ns))
+    os.replace(path + '.tmp', path)
+
+    assert cache.get('u', path).ntotal == 5
+
+
+def test_heap_loaded_indexes_are_charged_their_file_size(tmp_path):
+    vectors = np.random.default_rng(0).standard_normal((2000, 16)).astype('float32')
+    flat, hnsw = str(tmp_path / 'flat.faiss'), str(tmp_path / 'hnsw.faiss')
+    faiss.write_index(build_index('flat', vectors, np.arange(2000)), flat)
+    faiss.write_index(build_index('hnsw', vectors, np.arange(2000)), hnsw)
+    cache = IndexCache(max_bytes=1 << 30, mmap=True)
+
+    cache.get('flat', flat)
+    assert cache.stats()['bytes'] == 2000 * 16
+    cache.get('hnsw', hnsw)
+    assert cache.stats()['bytes'] == 2000 * 16 + os.stat(hnsw).st_size
@@ -0,0 +1,51 @@
+import uuid
+
+import pytest
+
+from server.config import Config
+from server.services import ingestion
+from server.services.vectors import get_meta_store, load_user_index
+
+
+def _manual(tmp_path, lines=300):
+    path = tmp_path / 'manual.txt'
+    path.write_text('\n'.join(f'Step {i}: bleed the hydraulic line before testing.' for i in range(lines)))
+    return str(path)
+
+
+def test_ingest_embeds_and_indexes_one_window_at_a_time(app, user_id, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'INGEST_WINDOW_CHUNKS', 3)
+    sizes = []
+    real_embed = ingestion.embed_chunks
+    monkeypatch.setattr(ingestion, 'embed_chunks', lambda texts: sizes.append(len(texts)) or real_embed(texts))
+
+    doc = ingestion.ingest_file(user_id, str(uuid.uuid4()), 'manual.txt', _manual(tmp_path))
+
+    assert max(sizes) == 3 and len(sizes) > 3
+    assert doc['chunk_count'] == sum(sizes) == get_meta_store(user_id).chunk_count()
+    assert load_user_index(user_id).ntotal == doc['chunk_count']
+
+
+def test_failure_part_way_leaves_no_chunks(app, user_id, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'INGEST_WINDOW_CHUNKS', 3)
+    calls = []
+    real_embed = ingestion.embed_chunks
+
+    def flaky_embed(texts):
+        calls.append(len(texts))
+        if len(calls) == 3:
+            raise RuntimeError('embedding server went away')
+        return real_embed(texts)
+
+    monkeypatch.setattr(ingestion, 'embed_chunks', flaky_embed)
+    file_id = str(uuid.uuid4())
+    with pytest.raises(RuntimeError):
+        ingestion.ingest_file(user_id, file_id, 'manual.txt', _manual(tmp_path))
+
+    store = get_meta_store(user_id)
+    assert store.get_document(file_id) is None
+    assert store.chunk_count() == 0
+
+    monkeypatch.setattr(ingestion, 'embed_chunks', real_embed)
+    doc = ingestion.ingest_file(user_id, file_id, 'manual.txt', _manual(tmp_path))
+    assert store.chunk_count() == doc['chunk_count']
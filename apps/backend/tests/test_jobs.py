@@ -0,0 +1,76 @@
+import fcntl
+import os
+import time
+from datetime import datetime
+
+from server.config import Config
+from server.services import jobs
+
+
+def _insert_job(tmp_path, user_id, status, worker, files):
+    now = datetime.now().isoformat()
+    job_id = f'job-{user_id}'
+    conn = jobs._connect()
+    try:
+        with conn:
+            conn.execute(
+                'INSERT INTO jobs (job_id, user_id, owner_id, status, worker, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, user_id, user_id, status, worker, now, now),
+            )
+            for position, (filename, file_status) in enumerate(files):
+                path = tmp_path / f'{position}-{filename}'
+                path.write_text(f'Text of {filename} about gearboxes. ' * 10)
+                conn.execute(
+                    'INSERT INTO job_files (job_id, position, file_id, filename, file_path, status) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (job_id, position, f'{user_id}-{position}', filename, str(path), file_status),
+                )
+    finally:
+        conn.close()
+    return job_id
+
+
+def _wait(job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get_job(job_id)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_running_job_of_dead_worker_is_resumed(app, tmp_path, user_id):
+    job_id = _insert_job(tmp_path, user_id, 'running', 'dead-worker', [('a.txt', 'embedding'), ('b.txt', 'queued')])
+
+    jobs.resume_pending_jobs()
+
+    job = _wait(job_id)
+    assert job['status'] == 'completed'
+    assert [f['status'] for f in job['files']] == ['done', 'done']
+
+
+def test_running_job_of_live_worker_is_left_alone(app, tmp_path, user_id):
+    os.makedirs(Config.JOB_WORKERS_FOLDER, exist_ok=True)
+    fd = os.open(os.path.join(Config.JOB_WORKERS_FOLDER, 'live-worker.lock'), os.O_RDWR | os.O_CREAT)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        job_id = _insert_job(tmp_path, user_id, 'running', 'live-worker', [('a.txt', 'extracting')])
+
+        jobs.resume_pending_jobs()
+        time.sleep(0.1)
+
+        assert jobs.get_job(job_id)['status'] == 'running'
+    finally:
+        os.close(fd)
+
+
+def test_resumed_job_skips_files_already_indexed(app, client, tmp_path, user_id):
+    job_id = _insert_job(tmp_path, user_id, 'running', None, [('a.txt', 'done'), ('b.txt', 'queued')])
+
+    jobs.resume_pending_jobs()
+
+    assert _wait(job_id)['status'] == 'completed'
+    documents = client.get('/api/documents', headers={'X-User-Id': user_id}).get_json()['documents']
+    assert [document['filename'] for document in documents] == ['b.txt']
@@ -0,0 +1,65 @@
+import sqlite3
+
+from server.services.meta_store import MetaStore
+
+
+LEGACY_SCHEMA = """
+CREATE TABLE documents (
+    position INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_id TEXT NOT NULL UNIQUE,
+    filename TEXT NOT NULL,
+    file_path TEXT,
+    upload_time TEXT,
+    chunk_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE chunks (
+    id INTEGER PRIMARY KEY,
+    file_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    page INTEGER,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    upload_time TEXT
+);
+CREATE TABLE counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT INTO documents (file_id, filename, chunk_count) VALUES ('f', 'pump.txt', 1);
+INSERT INTO chunks (id, file_id, chunk_index, text) VALUES (0, 'f', 0, 'impeller wear');
+"""
+
+
+def test_concurrent_keyword_upgrade_counts_terms_once(tmp_path):
+    path = str(tmp_path / 'meta.sqlite')
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+    first, second = MetaStore(path), MetaStore(path)
+    # Both workers see the legacy store before either takes the write lock.
+    first_conn = sqlite3.connect(path)
+    first_conn.row_factory = sqlite3.Row
+    second_conn = sqlite3.connect(path)
+    second_conn.row_factory = sqlite3.Row
+    real_execute = second_conn.execute
+
+    class RacingConnection:
+        def __getattr__(self, name):
+            return getattr(second_conn, name)
+
+        def __enter__(self):
+            return second_conn.__enter__()
+
+        def __exit__(self, *exc):
+            return second_conn.__exit__(*exc)
+
+        def execute(self, sql, *args):
+            if sql == 'BEGIN IMMEDIATE':
+                first._ensure_keyword_index(first_conn)
+            return real_execute(sql, *args)
+
+    MetaStore._keyword_ready.discard(path)
+    second._ensure_keyword_index(RacingConnection())
+
+    docs = dict(real_execute('SELECT term, docs FROM keyword_terms').fetchall())
+    first_conn.close()
+    second_conn.close()
+    assert docs == {'impeller': 1, 'wear': 1}
+    assert [chunk_id for chunk_id, _ in second.keyword_search('impeller')] == [0]
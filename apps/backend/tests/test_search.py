@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from server.config import Config
+from server.services.vectors import encode_texts, load_user_index, search_owners
+
+
+def test_hybrid_results_keep_cosine_similarity_in_score(user_id, upload, monkeypatch):
+    monkeypatch.setattr(Config, 'HYBRID_SEARCH', 1)
+    monkeypatch.setattr(Config, 'HYBRID_CANDIDATES', 5)
+    lines = [f'Section {i} covers routine maintenance of the cooling loop.' for i in range(600)]
+    lines[370] = 'Replace gasket part ZX-4471 when the seal weeps.'
+    assert upload(user_id, 'manual.txt', '\n'.join(lines).encode())['status'] == 'completed'
+
+    query = 'ZX-4471'
+    query_embedding = encode_texts([query])
+    hits = search_owners(query, [user_id], k=5, query_embedding=query_embedding)
+    index = load_user_index(user_id)
+
+    dense_ids = set(index.search(query_embedding, 5)[1][0].tolist())
+    keyword_only = [hit for hit in hits if hit['id'] not in dense_ids]
+    assert any('ZX-4471' in hit['text'] for hit in keyword_only)
+    for hit in hits:
+        vector = index.reconstruct_batch(np.asarray([hit['id']], dtype='int64'))[0]
+        assert hit['score'] == pytest.approx(float(vector @ query_embedding[0]), abs=1e-5)
+        assert 0 < hit['rrf_score'] <= 2 / (Config.RRF_K + 1)
+    assert [hit['rrf_score'] for hit in hits] == sorted((hit['rrf_score'] for hit in hits), reverse=True)
+
+
+def test_dense_only_results_have_no_rrf_score(user_id, upload, monkeypatch):
+    monkeypatch.setattr(Config, 'HYBRID_SEARCH', 0)
+    assert upload(user_id, 'notes.txt', b'Pumps need priming before start.')['status'] == 'completed'
+
+    hits = search_owners('priming pumps', [user_id], k=5)
+
+    assert hits and all('rrf_score' not in hit for hit in hits)
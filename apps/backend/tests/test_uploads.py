@@ -0,0 +1,71 @@
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+
+from server.config import Config
+from server.services.content_store import finish_artifacts, get_artifacts, put_artifacts
+
+
+def _blob(content):
+    content_hash = hashlib.sha256(content).hexdigest()
+    conn = sqlite3.connect(Config.CONTENT_DB)
+    try:
+        row = conn.execute('SELECT file_path, refcount FROM blobs WHERE content_hash = ?', (content_hash,)).fetchone()
+    finally:
+        conn.close()
+    return row
+
+
+def test_duplicate_upload_shares_one_blob(upload, user_id):
+    content = b'Shared manual text about pumps. ' * 10
+
+    upload(user_id, 'first.txt', content)
+    upload(user_id, 'second.txt', content)
+
+    file_path, refcount = _blob(content)
+    assert refcount == 2
+    assert os.path.exists(file_path)
+
+
+def test_failed_ingest_releases_the_uploaded_blob(upload, user_id):
+    content = b'\xff\xfe not utf-8 \xff'
+
+    job = upload(user_id, 'broken.txt', content)
+
+    assert job['status'] == 'failed'
+    assert _blob(content) is None
+    assert not os.path.exists(os.path.join(Config.UPLOAD_FOLDER, f'{hashlib.sha256(content).hexdigest()}.txt'))
+
+
+def _artifact_batches(content):
+    conn = sqlite3.connect(Config.CONTENT_DB)
+    try:
+        return conn.execute(
+            'SELECT COUNT(*) FROM artifact_batches WHERE content_hash = ?', (hashlib.sha256(content).hexdigest(),),
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_artifacts_are_stored_in_batches_and_relinked(upload, user_id, monkeypatch):
+    monkeypatch.setattr(Config, 'INGEST_WINDOW_CHUNKS', 2)
+    content = '\n'.join(f'Line {i} about centrifugal pump impellers.' for i in range(200)).encode()
+
+    first = upload(user_id, 'first.txt', content)
+    second = upload(f'{user_id}-other', 'second.txt', content)
+
+    chunk_count = first['files'][0]['chunk_count']
+    assert chunk_count > 4
+    assert _artifact_batches(content) == (chunk_count + 1) // 2
+    assert second['files'][0]['chunk_count'] == chunk_count
+
+
+def test_unfinished_artifacts_are_not_linked(app):
+    vectors = np.ones((1, 4), dtype='float32')
+    put_artifacts('partial-hash', 'sig', 0, [{'text': 'a'}], vectors)
+    assert get_artifacts('partial-hash', 'sig') is None
+
+    finish_artifacts('partial-hash', 'sig', 1)
+    assert [chunks for chunks, _ in get_artifacts('partial-hash', 'sig')] == [[{'text': 'a'}]]
@@ -0,0 +1,30 @@
+import json
+import threading
+
+from server.config import Config
+from server.services import users
+
+
+def test_legacy_users_already_migrated_by_another_worker(tmp_path, monkeypatch):
+    legacy = tmp_path / 'users.json'
+    legacy.write_text(json.dumps({'alice': {'user_id': 'u-alice', 'password_hash': 'x'}}))
+    monkeypatch.setattr(Config, 'USERS_DB', str(tmp_path / 'users.sqlite'))
+    monkeypatch.setattr(Config, 'USERS_FILE', str(tmp_path / 'absent.json'))
+    monkeypatch.setattr(users, '_initialized_path', None)
+    monkeypatch.setattr(users, '_local', threading.local())
+    conn = users._connect()
+    monkeypatch.setattr(Config, 'USERS_FILE', str(legacy))
+
+    # The other worker renames the file between our import and our rename.
+    real_replace = users.os.replace
+
+    def replace_after_other_worker(src, dst):
+        real_replace(src, dst)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(users.os, 'replace', replace_after_other_worker)
+    users._import_legacy_users(conn)
+
+    assert conn.execute("SELECT user_id FROM users WHERE username = 'alice'").fetchone()[0] == 'u-alice'
+    assert (tmp_path / 'users.json.migrated').exists()
+    conn.close()
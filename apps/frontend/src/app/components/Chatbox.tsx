@@ -120,9 +120,38 @@ const Chatbox = ({ isUploading, className }: ChatboxProps) => {
     setIsLoading(true);
     setUserInput("");
     try {
-      const response = await api.post('/api/chat', { query: userInput });
-      const botMsg: Message = { text: response.data.answer, isUser: false };
-      setMessages((prev: Message[]) => [...prev, botMsg]);
+      const response = await fetch('/api/chat/stream', {
+        method: 'POST',
+        credentials: 'include',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ query: userInput }),
+      });
+      if (!response.ok || !response.body) throw new Error(`chat failed: ${response.status}`);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let answer = '';
+      let started = false;
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop() || '';
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+          if (event === 'error') throw new Error(data.error);
+          if (event !== 'token') continue;
+          answer += data.text;
+          const botMsg: Message = { text: answer, isUser: false };
+          setMessages((prev: Message[]) => started ? [...prev.slice(0, -1), botMsg] : [...prev, botMsg]);
+          if (!started) {
+            started = true;
+            setIsLoading(false);
+          }
+        }
+      }
     } catch (error) {
       console.error(error);
       setMessages((prev: Message[]) => [...prev, { text: "Something went wrong!", isUser: false }]);
@@ -80,9 +80,20 @@ export default function FileUpload({setIsUploading}: {setIsUploading?: React.Dis
           },
         });
         if (response.data.user_id) setUserId(response.data.user_id);
-        setUploadedFiles((old) => [...old, ...response.data.files]);
+        // Ingestion runs in the background; poll the job until every file is processed
+        let job = response.data;
+        while (job.status === 'queued' || job.status === 'running') {
+          await new Promise((resolve) => setTimeout(resolve, 1000));
+          job = (await api.get(`/api/jobs/${response.data.job_id}`)).data;
+        }
+        const docs = await api.get(`/api/documents`);
+        setUploadedFiles(docs.data.documents || []);
         uploadingSetter(false);
-        toast.success('Files uploaded successfully');
+        if (job.status === 'failed') {
+          toast.error('Error processing files');
+        } else {
+          toast.success('Files uploaded successfully');
+        }
       } catch (error) {
         console.error('Error uploading files:', error);
         uploadingSetter(false);